@@ -0,0 +1,70 @@
+"""Async database access for async views.
+
+Flask runs every async view in a fresh event loop (through asgiref), and an
+async driver's connections belong to the loop that opened them, so an
+AsyncEngine's pool can't be shared across requests directly. Each worker
+process therefore runs one long-lived event loop in a background thread that
+owns the AsyncEngine and its pool. Views await statements on that loop, and
+gather() runs several at once on separate pooled connections, so independent
+queries overlap their round trips rather than running back to back.
+"""
+import asyncio
+import os
+import threading
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+ASYNC_DRIVERS = {'mysql': 'aiomysql', 'sqlite': 'aiosqlite'}
+
+
+def async_url(url):
+    """The async-driver equivalent of a sync database URL."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver for {backend} databases')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+class AsyncDatabase:
+    def __init__(self, url, **engine_options):
+        self.url = url
+        self.engine_options = engine_options
+        self._loop = None
+        self._engine = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Neither the loop thread nor the pool survives a fork, so each worker process starts its own
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='asyncdb', daemon=True).start()
+                self._engine = create_async_engine(self.url, **self.engine_options)
+                self._pid = os.getpid()
+            return self._loop
+
+    async def _fetch(self, statement, execution_options):
+        async with self._engine.connect() as conn:
+            return (await conn.execute(statement, execution_options=execution_options)).all()
+
+    async def _gather(self, statements, execution_options):
+        return await asyncio.gather(*(self._fetch(statement, execution_options) for statement in statements))
+
+    async def gather(self, *statements, execution_options=None):
+        """Rows of each statement, run concurrently on separate connections."""
+        future = asyncio.run_coroutine_threadsafe(self._gather(statements, execution_options or {}), self._start())
+        return await asyncio.wrap_future(future)
+
+    async def fetch_all(self, statement, execution_options=None):
+        return (await self.gather(statement, execution_options=execution_options))[0]
+
+    def close(self):
+        """Dispose of the pool and stop the loop thread; the next query starts them again."""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                asyncio.run_coroutine_threadsafe(self._engine.dispose(), self._loop).result()
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = self._engine = self._pid = None
@@ -2,6 +2,12 @@
 -- Created for the HT online booking system
 
 -- Drop existing tables if they exist
+DROP TABLE IF EXISTS seat_inventory;
+DROP TABLE IF EXISTS booking_daily_rollup;
+DROP TABLE IF EXISTS user_spend_rollup;
+DROP TABLE IF EXISTS catalog_version;
+DROP TABLE IF EXISTS reference_sequence;
+DROP TABLE IF EXISTS sessions;
 DROP TABLE IF EXISTS bookings;
 DROP TABLE IF EXISTS users;
 DROP TABLE IF EXISTS routes;
@@ -57,10 +63,65 @@ CREATE TABLE bookings (
     total_price DECIMAL(10,2) NOT NULL,
     status ENUM('pending', 'confirmed', 'cancelled') DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id),
     FOREIGN KEY (route_id) REFERENCES routes(id)
 );
 
+-- Create seat inventory table (remaining seats per route and journey date)
+CREATE TABLE seat_inventory (
+    route_id INT NOT NULL,
+    journey_date DATE NOT NULL,
+    seats_remaining INT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (route_id, journey_date),
+    FOREIGN KEY (route_id) REFERENCES routes(id)
+);
+
+-- Create rollup tables for the admin dashboard (maintained on booking and cancellation)
+CREATE TABLE booking_daily_rollup (
+    day DATE NOT NULL,
+    route_id INT NOT NULL,
+    mode ENUM('air', 'coach', 'train') NOT NULL,
+    class_type ENUM('standard', 'business') NOT NULL,
+    bookings INT NOT NULL DEFAULT 0,
+    passengers INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, route_id, mode, class_type),
+    FOREIGN KEY (route_id) REFERENCES routes(id)
+);
+
+CREATE TABLE user_spend_rollup (
+    user_id INT PRIMARY KEY,
+    bookings INT NOT NULL DEFAULT 0,
+    passengers INT NOT NULL DEFAULT 0,
+    spent DECIMAL(12,2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Create catalog version table (bumped whenever cities or routes change)
+CREATE TABLE catalog_version (
+    id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT INTO catalog_version (id, version) VALUES (1, 1);
+
+-- Create booking reference sequence (workers reserve blocks of numbers from it)
+CREATE TABLE reference_sequence (
+    id INT PRIMARY KEY,
+    next_value BIGINT NOT NULL DEFAULT 0
+);
+
+-- Create server-side sessions table (expired rows are swept by the app)
+CREATE TABLE sessions (
+    id VARCHAR(64) PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX ix_sessions_expires_at (expires_at)
+);
+
 -- Insert sample cities
 INSERT INTO cities (name) VALUES
 ('London'),
@@ -114,23 +175,58 @@ CREATE TABLE CancellationRules (
 
 -- Insert sample data for Discounts
 INSERT INTO Discounts (min_days, max_days, discount_percentage) VALUES
-(80, 90, 25.00),
+(80, 9999, 25.00),
 (60, 79, 15.00),
 (45, 59, 10.00),
 (0, 44, 0.00);
 
 -- Insert sample data for CancellationRules
 INSERT INTO CancellationRules (min_days, max_days, charge_percentage) VALUES
-(60, 999, 0.00),
-(30, 59, 40.00),
-(0, 29, 100.00);
+(61, 9999, 0.00),
+(31, 60, 40.00),
+(0, 30, 100.00);
 
 INSERT INTO bookings (user_id, route_id, reference, journey_date, passengers, class_type, base_price, class_upgrade, discount, total_price, status)
 VALUES
 (1, 1, 'BK123456', '2025-05-15', 2, 'standard', 100.00, 0.00, 20.00, 180.00, 'confirmed');
 
+-- Seat inventory and dashboard rollups for the sample bookings, as
+-- `flask rebuild-inventory` and `flask rebuild-rollups` compute them
+INSERT INTO seat_inventory (route_id, journey_date, seats_remaining)
+SELECT b.route_id, b.journey_date, r.available_seats - SUM(b.passengers)
+FROM bookings b
+JOIN routes r ON r.id = b.route_id
+WHERE b.status != 'cancelled'
+GROUP BY b.route_id, b.journey_date, r.available_seats;
+
+INSERT INTO booking_daily_rollup (day, route_id, mode, class_type, bookings, passengers, revenue)
+SELECT DATE(b.created_at), b.route_id, r.mode, b.class_type, COUNT(b.id), SUM(b.passengers), SUM(b.total_price)
+FROM bookings b
+JOIN routes r ON r.id = b.route_id
+WHERE b.status != 'cancelled'
+GROUP BY DATE(b.created_at), b.route_id, r.mode, b.class_type;
+
+INSERT INTO user_spend_rollup (user_id, bookings, passengers, spent)
+SELECT user_id, COUNT(id), SUM(passengers), SUM(total_price)
+FROM bookings
+WHERE status != 'cancelled'
+GROUP BY user_id;
+
 -- Create indexes for better performance
 CREATE INDEX idx_routes_cities ON routes(from_city_id, to_city_id);
+CREATE INDEX idx_bookings_user_journey ON bookings(user_id, journey_date, status);
+CREATE INDEX idx_bookings_route_journey ON bookings(route_id, journey_date);
+CREATE INDEX idx_bookings_created_at ON bookings(created_at);
+CREATE INDEX idx_bookings_updated_at ON bookings(updated_at);
+CREATE INDEX idx_users_created_at ON users(created_at);
+CREATE INDEX idx_user_spend_rollup_bookings ON user_spend_rollup(bookings);
+
+-- This schema matches migration 0003; later ones are applied with `flask db upgrade`
+CREATE TABLE alembic_version (
+    version_num VARCHAR(32) NOT NULL,
+    PRIMARY KEY (version_num)
+);
+INSERT INTO alembic_version (version_num) VALUES ('0003');
 
 -- Create views for common queries
 CREATE VIEW available_journeys AS
@@ -0,0 +1,220 @@
+"""Index advice from EXPLAIN plans.
+
+With QUERY_CAPTURE_PATH set, the app appends each distinct statement it runs
+to an NDJSON file (QueryCapture). The advisor replays the captured SELECT,
+UPDATE and DELETE statements through the database's EXPLAIN and reports full
+table scans and filesorts. For each scanned or sorted table it proposes a
+composite index: the columns compared for equality first, then one range
+column or the ORDER BY columns. A proposal is dropped when an existing index
+(or a wider proposal) already starts with the same columns.
+
+The column choice reads the WHERE and ORDER BY clauses of the SQL that
+SQLAlchemy renders, so it only sees plain `table.column <op> parameter`
+comparisons. Conditions on expressions such as date(created_at) can't use an
+index as written; those statements are reported without a proposal.
+"""
+import json
+import re
+import threading
+from collections import namedtuple
+
+from alembic.autogenerate import render_python_code
+from alembic.operations import ops
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+Finding = namedtuple('Finding', ['statement', 'table', 'problem', 'detail'])
+
+
+class Proposal(namedtuple('Proposal', ['table', 'columns'])):
+    @property
+    def name(self):
+        return f"idx_{self.table}_{'_'.join(self.columns)}".lower()[:64]
+
+
+class QueryCapture:
+    def __init__(self, path):
+        self.path = path
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def record(self, dialect, statement, parameters):
+        """Append the statement unless this process has already recorded it."""
+        if statement.lstrip()[:6].upper() not in EXPLAINABLE:
+            return
+        key = (dialect, statement)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen.add(key)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({'dialect': dialect, 'statement': statement, 'parameters': parameters}, default=str) + '\n')
+
+
+def load_captured(path, dialect):
+    """Distinct (statement, parameters) recorded against `dialect`; other workers may have recorded the same ones."""
+    captured = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record['dialect'] == dialect:
+                    captured.setdefault(record['statement'], record['parameters'])
+    return list(captured.items())
+
+
+# Plans
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS (\w+))?$')
+
+
+def explain(conn, statement, parameters):
+    """Findings for one statement, with tables under the names (or aliases) the statement uses."""
+    dialect = conn.dialect.name
+    if isinstance(parameters, list):
+        parameters = tuple(parameters)
+    findings = []
+    if dialect == 'sqlite':
+        for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+            detail = row[3]
+            scan = _SQLITE_SCAN.match(detail)
+            if scan:
+                findings.append(Finding(statement, scan.group(2) or scan.group(1), 'full scan', detail))
+            elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+                findings.append(Finding(statement, None, 'filesort', detail))
+    elif dialect == 'mysql':
+        for row in conn.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings():
+            extra = row.get('Extra') or ''
+            if row['type'] == 'ALL':
+                findings.append(Finding(statement, row['table'], 'full scan', f"~{row['rows']} rows; {extra}"))
+            if 'Using filesort' in extra:
+                findings.append(Finding(statement, row['table'], 'filesort', extra))
+    else:
+        raise ValueError(f'No EXPLAIN support for {dialect}')
+    return findings
+
+
+# Columns
+
+_ALIAS = re.compile(r'\b(\w+) AS (\w+)\b')
+_COMPARISON = re.compile(
+    r'\b(\w+)\.(\w+)\s*(=|<=|>=|<>|!=|<|>|NOT IN\b|IN\b|IS NOT\b|IS\b|BETWEEN\b|NOT LIKE\b|LIKE\b)\s*(\S+)',
+    re.IGNORECASE
+)
+_CLAUSE_END = r'(?=\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|\bFOR UPDATE\b|$)'
+_WHERE = re.compile(r'\bWHERE\b(.*?)' + _CLAUSE_END, re.IGNORECASE | re.DOTALL)
+_ORDER_BY = re.compile(r'\bORDER BY\b(.*?)(?=\bLIMIT\b|\bFOR UPDATE\b|$)', re.IGNORECASE | re.DOTALL)
+_ORDER_COLUMN = re.compile(r'^\s*(\w+)\.(\w+)(?:\s+(?:ASC|DESC))?\s*$', re.IGNORECASE)
+_EQUALITY = ('=', 'IN', 'IS')
+_UNINDEXABLE = ('<>', '!=', 'NOT IN', 'IS NOT', 'NOT LIKE')
+
+
+def aliases(statement):
+    """Map every `table AS alias` in the statement to its table."""
+    return {alias: table for table, alias in _ALIAS.findall(statement)}
+
+
+def _or_groups(clause):
+    """(start, end) of each parenthesised group that contains an OR."""
+    groups, stack = [], []
+    for position, char in enumerate(clause):
+        if char == '(':
+            stack.append(position)
+        elif char == ')' and stack:
+            start = stack.pop()
+            if not stack and re.search(r'\bOR\b', clause[start:position], re.IGNORECASE):
+                groups.append((start, position))
+    return groups
+
+
+def columns_used(statement, table_alias):
+    """(equality columns, range columns, order-by columns) of one table, in statement order."""
+    equality, ranges, order = [], [], []
+    where = _WHERE.search(statement)
+    clause = where.group(1) if where else ''
+    or_groups = _or_groups(clause)
+    for match in _COMPARISON.finditer(clause):
+        alias, column, operator, operand = match.groups()
+        operator = ' '.join(operator.upper().split())
+        if alias != table_alias or operator in _UNINDEXABLE:
+            continue
+        if re.match(r'^\(?[A-Za-z_]\w*\.\w+', operand):
+            continue  # A join condition, served by the other table's key
+        # Either side of an OR may match, so neither can lead an index; treat both as ranges
+        in_or = any(start < match.start() < end for start, end in or_groups)
+        target = equality if operator in _EQUALITY and not in_or else ranges
+        if column not in target:
+            target.append(column)
+    # Keyset conditions compare a column for both equality and range; it acts as a range
+    equality = [column for column in equality if column not in ranges]
+
+    order_by = _ORDER_BY.search(statement)
+    if order_by:
+        for term in order_by.group(1).split(','):
+            match = _ORDER_COLUMN.match(term)
+            if not match or match.group(1) != table_alias:
+                break
+            order.append(match.group(2))
+    return equality, ranges, order
+
+
+def order_table(statement):
+    """Alias of the table the ORDER BY starts with, if it starts with a column."""
+    order_by = _ORDER_BY.search(statement)
+    match = _ORDER_COLUMN.match(order_by.group(1).split(',')[0]) if order_by else None
+    return match.group(1) if match else None
+
+
+def propose(finding, primary_keys):
+    """Proposal for a finding, or None when the statement gives nothing to index on.
+
+    `primary_keys` maps each table to its primary key columns.
+    """
+    table_alias = finding.table or order_table(finding.statement)
+    if table_alias is None:
+        return None
+    table = aliases(finding.statement).get(table_alias, table_alias)
+    equality, ranges, order = columns_used(finding.statement, table_alias)
+    primary_key = tuple(primary_keys.get(table, ()))
+
+    columns = list(equality)
+    if ranges and (not order or order[0] != ranges[0]):
+        columns.append(ranges[0])
+    elif order:
+        columns.extend(column for column in order if column not in columns)
+    # Secondary indexes already end with the primary key
+    while columns and columns[-1] in primary_key and len(columns) > 1:
+        columns.pop()
+    if not columns or tuple(columns) == primary_key:
+        return None
+    return Proposal(table, tuple(columns))
+
+
+def merge(proposals, existing):
+    """Drop proposals already covered by an existing index or a wider proposal.
+
+    `existing` maps each table to the column tuples of its indexes and keys.
+    """
+    proposals = set(proposals)
+    kept = []
+    for proposal in sorted(proposals):
+        covering = list(existing.get(proposal.table, ())) + [
+            other.columns for other in proposals if other.table == proposal.table and other != proposal
+        ]
+        if not any(tuple(index[:len(proposal.columns)]) == proposal.columns for index in covering):
+            kept.append(proposal)
+    return kept
+
+
+def migration_code(proposals):
+    """(upgrade, downgrade) bodies for a migration that creates the proposed indexes."""
+    upgrade = ops.UpgradeOps([
+        ops.CreateIndexOp(proposal.name, proposal.table, list(proposal.columns)) for proposal in proposals
+    ])
+    downgrade = ops.DowngradeOps([
+        ops.DropIndexOp(proposal.name, table_name=proposal.table) for proposal in reversed(proposals)
+    ])
+    return (
+        render_python_code(upgrade, render_as_batch=True).strip(),
+        render_python_code(downgrade, render_as_batch=True).strip()
+    )
@@ -0,0 +1,175 @@
+"""Multi-leg journey planning over the route timetable.
+
+Every route runs once a day at a fixed time on its mode's operating days.
+The planner builds a departure index per city once (per catalog version) and
+answers queries with a round-based Pareto search: round k finds all
+non-dominated journeys with k legs, keyed on arrival time, fare and changes.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+MINUTES_PER_DAY = 24 * 60
+
+# Weekdays (Mon=0) each mode operates on, matching the booking page labels
+OPERATING_DAYS = {
+    'air': frozenset({0, 1, 2, 3, 4}),        # Mon-Fri
+    'coach': frozenset({0, 1, 2, 3, 5, 6}),   # Sat-Thurs
+    'train': frozenset(range(7))              # All week
+}
+
+OBJECTIVES = ('earliest', 'cheapest', 'fewest_changes')
+
+Leg = namedtuple('Leg', [
+    'route', 'from_city_id', 'to_city_id', 'mode',
+    'departure_minute', 'duration', 'days', 'fares'
+])
+
+Label = namedtuple('Label', ['city_id', 'mode', 'arrival', 'cost', 'legs', 'cities'])
+
+
+def _minutes(t):
+    return t.hour * 60 + t.minute
+
+
+class JourneyPlanner:
+    def __init__(self, routes, min_connection=30, min_connection_change_mode=60):
+        self.min_connection = min_connection
+        self.min_connection_change_mode = min_connection_change_mode
+        self.departures = {}
+        for route in routes:
+            departure = _minutes(route.departure_time)
+            # Arrivals earlier than the departure time are next-day (overnight) services
+            duration = (_minutes(route.arrival_time) - departure) % MINUTES_PER_DAY
+            self.departures.setdefault(route.from_city_id, []).append(Leg(
+                route=route,
+                from_city_id=route.from_city_id,
+                to_city_id=route.to_city_id,
+                mode=route.mode,
+                departure_minute=departure,
+                duration=duration,
+                days=OPERATING_DAYS.get(route.mode, OPERATING_DAYS['train']),
+                fares={'standard': float(route.standard_fare), 'business': float(route.business_fare)}
+            ))
+        for legs in self.departures.values():
+            legs.sort(key=lambda leg: leg.departure_minute)
+
+    def _connection_time(self, from_mode, to_mode):
+        if from_mode is None:
+            return 0
+        if from_mode != to_mode:
+            return self.min_connection_change_mode
+        return self.min_connection
+
+    @staticmethod
+    def _next_departure(leg, ready, start_weekday, horizon):
+        # First run of the leg at or after `ready` minutes on an operating day
+        day, minute = divmod(ready, MINUTES_PER_DAY)
+        if minute > leg.departure_minute:
+            day += 1
+        for offset in range(7):
+            departure = (day + offset) * MINUTES_PER_DAY + leg.departure_minute
+            if departure > horizon:
+                return None
+            if (start_weekday + day + offset) % 7 in leg.days:
+                return departure
+        return None
+
+    @staticmethod
+    def _dominated(label, bag):
+        for other in bag:
+            if other.arrival <= label.arrival and other.cost <= label.cost and len(other.legs) <= len(label.legs):
+                return True
+        return False
+
+    def search(self, from_city_id, to_city_id, depart_after, objective='earliest', mode=None,
+               seat_class='standard', passengers=1, max_legs=4, horizon_days=2, limit=5):
+        """Return journeys from `depart_after` (a datetime) ordered by `objective`."""
+        if objective not in OBJECTIVES:
+            raise ValueError(f'Unknown objective: {objective}')
+        if from_city_id == to_city_id:
+            return []
+
+        start_day = datetime.combine(depart_after.date(), datetime.min.time())
+        start_weekday = start_day.weekday()
+        start = _minutes(depart_after.time())
+        horizon = start + horizon_days * MINUTES_PER_DAY
+
+        bags = {}
+        results = []
+        frontier = [Label(from_city_id, None, start, 0.0, (), frozenset({from_city_id}))]
+
+        for _ in range(max_legs):
+            next_frontier = []
+            for label in frontier:
+                for leg in self.departures.get(label.city_id, ()):
+                    if mode and leg.mode != mode:
+                        continue
+                    if leg.to_city_id in label.cities:
+                        continue
+
+                    ready = label.arrival + self._connection_time(label.mode, leg.mode)
+                    departure = self._next_departure(leg, ready, start_weekday, horizon)
+                    if departure is None:
+                        continue
+
+                    candidate = Label(
+                        city_id=leg.to_city_id,
+                        mode=leg.mode,
+                        arrival=departure + leg.duration,
+                        cost=label.cost + leg.fares[seat_class] * passengers,
+                        legs=label.legs + ((leg, departure),),
+                        cities=label.cities | {leg.to_city_id}
+                    )
+                    bag = bags.setdefault((leg.to_city_id, leg.mode), [])
+                    if self._dominated(candidate, bag):
+                        continue
+                    bag.append(candidate)
+
+                    if leg.to_city_id == to_city_id:
+                        results.append(candidate)
+                    else:
+                        next_frontier.append(candidate)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        # Keep only journeys that are not beaten on every criterion by another one
+        results = [label for label in results if not any(
+            other is not label
+            and other.arrival <= label.arrival and other.cost <= label.cost
+            and len(other.legs) <= len(label.legs)
+            and (other.arrival, other.cost, len(other.legs)) != (label.arrival, label.cost, len(label.legs))
+            for other in results
+        )]
+
+        if objective == 'earliest':
+            results.sort(key=lambda label: (label.arrival, len(label.legs), label.cost))
+        elif objective == 'cheapest':
+            results.sort(key=lambda label: (label.cost, label.arrival, len(label.legs)))
+        else:
+            results.sort(key=lambda label: (len(label.legs), label.arrival, label.cost))
+
+        return [self._journey(label, start_day, seat_class, passengers) for label in results[:limit]]
+
+    @staticmethod
+    def _journey(label, start_day, seat_class, passengers):
+        legs = []
+        for leg, departure in label.legs:
+            legs.append({
+                'route_id': leg.route.id,
+                'from': leg.route.from_city.name,
+                'to': leg.route.to_city.name,
+                'mode': leg.mode,
+                'departure': (start_day + timedelta(minutes=departure)).isoformat(timespec='minutes'),
+                'arrival': (start_day + timedelta(minutes=departure + leg.duration)).isoformat(timespec='minutes'),
+                'fare': round(leg.fares[seat_class] * passengers, 2)
+            })
+        first_departure = label.legs[0][1]
+        return {
+            'departure': legs[0]['departure'],
+            'arrival': legs[-1]['arrival'],
+            'duration_minutes': label.arrival - first_departure,
+            'changes': len(legs) - 1,
+            'total_fare': round(label.cost, 2),
+            'legs': legs
+        }
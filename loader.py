@@ -0,0 +1,96 @@
+"""Reading records for bulk loads.
+
+Records come from CSV (with a header row) or NDJSON files, optionally gzipped,
+and are read lazily so a file of any size loads in flat memory. Values are
+parsed by the small helpers below, which raise ValueError with a readable
+message for the caller to report with the record's line number.
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+FORMATS = ('csv', 'ndjson')
+
+
+class LoadError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    raise ValueError(f'Cannot tell the format of {path}; pass --format')
+
+
+def read_records(path, fmt=None):
+    """Yield (line_number, record dict) for every record in the file."""
+    fmt = fmt or detect_format(path)
+    raw = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+    with io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        raise LoadError(line_number, f'invalid JSON: {e}')
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def required(record, field):
+    value = record.get(field)
+    if value is None or value == '':
+        raise ValueError(f'{field} is required')
+    return value
+
+
+def parse_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    # Columns hold naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_time(value):
+    return datetime.strptime(str(value)[:5], '%H:%M').time()
+
+
+def parse_decimal(value):
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'{value!r} is not a number')
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
@@ -0,0 +1,137 @@
+"""Per-endpoint request metrics in the Prometheus text format.
+
+Each thread records into its own dictionary, so recording a request never
+takes a lock. A scrape merges every thread's numbers. When a thread exits its
+numbers are folded into one shared total, so thread churn doesn't grow the
+registry. Metrics are per worker process and carry a `worker` label so
+multiple workers don't clash.
+"""
+import os
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.count += other.count
+
+
+class _ThreadStats:
+    def __init__(self):
+        self.requests = {}      # (endpoint, method, status) -> count
+        self.latency = {}       # endpoint -> _Histogram of seconds
+        self.statements = {}    # endpoint -> _Histogram of statements per request
+        self.db_time = {}       # endpoint -> _Histogram of database seconds per request
+
+    def merge(self, other):
+        for key, count in dict(other.requests).items():
+            self.requests[key] = self.requests.get(key, 0) + count
+        for source, target, buckets in (
+            (other.latency, self.latency, LATENCY_BUCKETS),
+            (other.statements, self.statements, STATEMENT_BUCKETS),
+            (other.db_time, self.db_time, LATENCY_BUCKETS)
+        ):
+            for endpoint, histogram in dict(source).items():
+                target.setdefault(endpoint, _Histogram(buckets)).merge(histogram)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._threads = {}  # live thread -> its _ThreadStats
+        self._retired = _ThreadStats()  # totals of threads that have exited
+        self._register_lock = threading.Lock()
+        self.worker = str(os.getpid())
+
+    def _stats(self):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            stats = self._local.stats = _ThreadStats()
+            # Only taken once per thread, never on the request path after that
+            with self._register_lock:
+                self._retire_exited()
+                self._threads[threading.current_thread()] = stats
+        return stats
+
+    def _retire_exited(self):
+        """Fold the stats of exited threads into the retired totals. Call with the register lock held."""
+        for thread in [thread for thread in self._threads if not thread.is_alive()]:
+            # An exited thread can't record any more, so its stats are final
+            self._retired.merge(self._threads.pop(thread))
+
+    def observe(self, endpoint, method, status, seconds, statements, db_seconds):
+        stats = self._stats()
+        key = (endpoint, method, status)
+        stats.requests[key] = stats.requests.get(key, 0) + 1
+        for histograms, buckets, value in (
+            (stats.latency, LATENCY_BUCKETS, seconds),
+            (stats.statements, STATEMENT_BUCKETS, statements),
+            (stats.db_time, LATENCY_BUCKETS, db_seconds)
+        ):
+            histogram = histograms.get(endpoint)
+            if histogram is None:
+                histogram = histograms[endpoint] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def _merged(self):
+        merged = _ThreadStats()
+        with self._register_lock:
+            self._retire_exited()
+            merged.merge(self._retired)
+            threads = list(self._threads.values())
+        for stats in threads:
+            merged.merge(stats)
+        return merged.requests, merged.latency, merged.statements, merged.db_time
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        requests, latency, statements, db_time = self._merged()
+        worker = self.worker
+        lines = [
+            '# HELP http_requests_total Requests handled, by endpoint, method and status.',
+            '# TYPE http_requests_total counter'
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(
+                f'http_requests_total{{worker="{worker}",endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+            )
+
+        for name, help_text, histograms in (
+            ('http_request_duration_seconds', 'Request latency in seconds.', latency),
+            ('db_statements_per_request', 'SQL statements executed per request.', statements),
+            ('db_time_seconds_per_request', 'Time spent in SQL statements per request, in seconds.', db_time)
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for endpoint, histogram in sorted(histograms.items()):
+                labels = f'worker="{worker}",endpoint="{endpoint}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,160 @@
+"""Tables and indexes added since the baseline
+
+Tables: seat inventory, catalog version, the booking rollups, the booking
+reference sequence and server-side sessions, plus the pricing rule tables
+when ht_booking.sql didn't already make them. Databases made by create_all()
+during this work already have some of them, so each is created only if
+missing. Seat inventory and the rollups are computed from the existing
+bookings, since the app only adjusts them as bookings are made or cancelled.
+
+Indexes were chosen from `flask advise-indexes` over the test suite and
+tests.load.bench: bookings by user or route and journey date, created_at
+ranges for reports, new users for the dashboard and top customers from the
+spend rollup.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 04:56:55.009896
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def _create_tables(existing):
+    if 'CancellationRules' not in existing:
+        op.create_table('CancellationRules',
+        sa.Column('rule_id', sa.Integer(), nullable=False),
+        sa.Column('min_days', sa.Integer(), nullable=False),
+        sa.Column('max_days', sa.Integer(), nullable=False),
+        sa.Column('charge_percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('rule_id')
+        )
+    if 'Discounts' not in existing:
+        op.create_table('Discounts',
+        sa.Column('discount_id', sa.Integer(), nullable=False),
+        sa.Column('min_days', sa.Integer(), nullable=False),
+        sa.Column('max_days', sa.Integer(), nullable=False),
+        sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('discount_id')
+        )
+    if 'catalog_version' not in existing:
+        op.create_table('catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'reference_sequence' not in existing:
+        op.create_table('reference_sequence',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'sessions' not in existing:
+        op.create_table('sessions',
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('sessions', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_sessions_expires_at'), ['expires_at'], unique=False)
+
+    if 'user_spend_rollup' not in existing:
+        op.create_table('user_spend_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('bookings', sa.Integer(), nullable=False),
+        sa.Column('passengers', sa.Integer(), nullable=False),
+        sa.Column('spent', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+        op.execute(
+            "INSERT INTO user_spend_rollup (user_id, bookings, passengers, spent) "
+            "SELECT user_id, COUNT(id), SUM(passengers), SUM(total_price) FROM bookings "
+            "WHERE status != 'cancelled' GROUP BY user_id"
+        )
+    if 'booking_daily_rollup' not in existing:
+        op.create_table('booking_daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('route_id', sa.Integer(), nullable=False),
+        sa.Column('mode', sa.Enum('air', 'coach', 'train'), nullable=False),
+        sa.Column('class_type', sa.Enum('standard', 'business'), nullable=False),
+        sa.Column('bookings', sa.Integer(), nullable=False),
+        sa.Column('passengers', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['route_id'], ['routes.id'], ),
+        sa.PrimaryKeyConstraint('day', 'route_id', 'mode', 'class_type')
+        )
+        op.execute(
+            "INSERT INTO booking_daily_rollup (day, route_id, mode, class_type, bookings, passengers, revenue) "
+            "SELECT DATE(bookings.created_at), bookings.route_id, routes.mode, bookings.class_type, "
+            "COUNT(bookings.id), SUM(bookings.passengers), SUM(bookings.total_price) "
+            "FROM bookings JOIN routes ON routes.id = bookings.route_id "
+            "WHERE bookings.status != 'cancelled' AND bookings.created_at IS NOT NULL "
+            "GROUP BY DATE(bookings.created_at), bookings.route_id, routes.mode, bookings.class_type"
+        )
+    if 'seat_inventory' not in existing:
+        op.create_table('seat_inventory',
+        sa.Column('route_id', sa.Integer(), nullable=False),
+        sa.Column('journey_date', sa.Date(), nullable=False),
+        sa.Column('seats_remaining', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['route_id'], ['routes.id'], ),
+        sa.PrimaryKeyConstraint('route_id', 'journey_date')
+        )
+        # Without this, journeys sold before the upgrade would start with every seat free
+        op.execute(
+            "INSERT INTO seat_inventory (route_id, journey_date, seats_remaining, updated_at) "
+            "SELECT bookings.route_id, bookings.journey_date, "
+            "routes.available_seats - SUM(bookings.passengers), CURRENT_TIMESTAMP "
+            "FROM bookings JOIN routes ON routes.id = bookings.route_id "
+            "WHERE bookings.status != 'cancelled' "
+            "GROUP BY bookings.route_id, bookings.journey_date, routes.available_seats"
+        )
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    _create_tables(set(inspector.get_table_names()))
+    # Databases made by create_all() after the user dashboard change already have idx_bookings_user_journey
+    existing = {index['name'] for index in inspector.get_indexes('bookings')}
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('idx_bookings_created_at', ['created_at'], unique=False)
+        batch_op.create_index('idx_bookings_route_journey', ['route_id', 'journey_date'], unique=False)
+        if 'idx_bookings_user_journey' not in existing:
+            batch_op.create_index('idx_bookings_user_journey', ['user_id', 'journey_date', 'status'], unique=False)
+
+    with op.batch_alter_table('user_spend_rollup', schema=None) as batch_op:
+        batch_op.create_index('idx_user_spend_rollup_bookings', ['bookings'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('idx_users_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('idx_users_created_at')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('idx_bookings_user_journey')
+        batch_op.drop_index('idx_bookings_route_journey')
+        batch_op.drop_index('idx_bookings_created_at')
+
+    # The pricing rule tables predate migrations in ht_booking.sql, so they and their rules are kept
+    op.drop_table('seat_inventory')
+    op.drop_table('booking_daily_rollup')
+    op.drop_table('user_spend_rollup')
+    with op.batch_alter_table('sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sessions_expires_at'))
+    op.drop_table('sessions')
+    op.drop_table('reference_sequence')
+    op.drop_table('catalog_version')
@@ -0,0 +1,69 @@
+"""In-memory cache of rendered pages.
+
+Entries are keyed by whatever identifies a page's content (e.g. endpoint, query
+arguments and catalog version). They hold the body, a gzipped copy and an
+ETag, so a hit costs no rendering and no compression. The cache evicts least
+recently used entries to stay within a byte budget.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+CachedPage = namedtuple('CachedPage', ['body', 'gzip_body', 'etag', 'last_modified'])
+
+
+def build_page(body):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return CachedPage(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=6, mtime=0),
+        etag=hashlib.sha1(body).hexdigest(),
+        last_modified=datetime.now(timezone.utc).replace(microsecond=0)
+    )
+
+
+class PageCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cost(page):
+        return len(page.body) + len(page.gzip_body)
+
+    def get(self, key):
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key, page):
+        cost = self._cost(page)
+        if cost > self.max_bytes:
+            return page
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= self._cost(previous)
+            self._entries[key] = page
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= self._cost(evicted)
+        return page
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
@@ -0,0 +1,64 @@
+"""Password hashing in a process pool.
+
+Each hash or check is a deliberately slow KDF, so it runs in worker processes.
+That keeps it from holding the GIL in request threads. At most `max_pending`
+operations may be queued or running at once. Beyond that, callers get
+HasherBusy straight away (after `wait` seconds at most) rather than piling up
+behind a login storm.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, method='pbkdf2:sha256:260000', workers=1, max_pending=8, wait=0.1, timeout=30):
+        """`method` is a Werkzeug hash method and must include its cost (e.g. iterations).
+
+        workers=0 hashes in the calling thread, for scripts and tests.
+        """
+        self.method = method
+        self.workers = workers
+        self.wait = wait
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        # Pools don't survive a fork, so each worker process starts its own
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.wait):
+            raise HasherBusy('Too many password operations in progress, please try again shortly')
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was made with a different method or cost than the current one."""
+        return pwhash.split('$', 1)[0] != self.method
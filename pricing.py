@@ -0,0 +1,72 @@
+"""Fare quotes and cancellation charges driven by the Discounts and
+CancellationRules tables.
+
+Each rule table is held as a list of (min_days, max_days, percentage)
+intervals sorted by min_days, so a lookup is a binary search.
+"""
+from bisect import bisect_right
+from collections import namedtuple
+
+Quote = namedtuple('Quote', ['base_price', 'discount_percentage', 'discount', 'total_price'])
+CancellationCharge = namedtuple('CancellationCharge', ['charge_percentage', 'fee', 'refund'])
+
+
+class RuleTable:
+    def __init__(self, rules):
+        self.rules = sorted((int(low), int(high), float(percentage)) for low, high, percentage in rules)
+        self.starts = [rule[0] for rule in self.rules]
+
+    def lookup(self, days):
+        """Percentage of the interval containing `days`, or None if no rule covers it."""
+        index = bisect_right(self.starts, days) - 1
+        # Intervals should not overlap, but if they do the most specific (latest start) wins
+        while index >= 0:
+            low, high, percentage = self.rules[index]
+            if low <= days <= high:
+                return percentage
+            index -= 1
+        return None
+
+    def __bool__(self):
+        return bool(self.rules)
+
+
+class PricingRules:
+    def __init__(self, discounts, cancellations):
+        self.discounts = RuleTable(discounts)
+        self.cancellations = RuleTable(cancellations)
+
+    def discount_percentage(self, days_in_advance):
+        return self.discounts.lookup(days_in_advance) or 0.0
+
+    def quote(self, fare, passengers, days_in_advance):
+        """Price `passengers` seats at `fare` each, booked `days_in_advance` days ahead."""
+        percentage = self.discount_percentage(days_in_advance)
+        gross = float(fare) * passengers
+        discount = round(gross * percentage / 100, 2)
+        return Quote(
+            base_price=float(fare),
+            discount_percentage=percentage,
+            discount=discount,
+            total_price=round(gross - discount, 2)
+        )
+
+    def quote_many(self, fares, passengers, days_in_advance):
+        """Quote parallel sequences of fares, passenger counts and days in advance."""
+        # Discount lookups are shared by every quote for the same day offset
+        percentages = {days: self.discount_percentage(days) for days in set(days_in_advance)}
+        quotes = []
+        for fare, count, days in zip(fares, passengers, days_in_advance):
+            gross = float(fare) * count
+            discount = round(gross * percentages[days] / 100, 2)
+            quotes.append(Quote(float(fare), percentages[days], discount, round(gross - discount, 2)))
+        return quotes
+
+    def cancellation_charge(self, total_price, days_to_journey):
+        percentage = self.cancellations.lookup(days_to_journey)
+        if percentage is None:
+            # Later than every rule covers (e.g. the journey has passed) means no refund
+            first = self.cancellations.starts[0] if self.cancellations else 0
+            percentage = 100.0 if days_to_journey < first else 0.0
+        fee = round(float(total_price) * percentage / 100, 2)
+        return CancellationCharge(percentage, fee, round(float(total_price) - fee, 2))
@@ -0,0 +1,71 @@
+"""Booking reference generation.
+
+References are a keyed permutation of a sequence number, so they look random
+but are unique by construction and need no database lookup. Sequence numbers
+come from blocks reserved in the database, so a worker only makes a round
+trip once every `block_size` bookings.
+
+References are 8 characters of Crockford base32 (no I, L, O or U). The first
+character is always G-Z, so a new reference can never equal one of the older
+8-character hex references (which only use 0-9 and A-F).
+"""
+import hashlib
+import threading
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+LENGTH = 8
+HALF_BITS = 20              # Feistel network over 40 bits (8 base32 characters)
+HALF_MASK = (1 << HALF_BITS) - 1
+SPACE_BITS = 39             # Values below 2**39; the 40th bit is always set on output
+ROUNDS = 4
+
+
+def _round(key, index, value):
+    digest = hashlib.blake2b(value.to_bytes(3, 'big'), digest_size=4, key=key, person=bytes([index]) * 16).digest()
+    return int.from_bytes(digest, 'big') & HALF_MASK
+
+
+def _feistel(key, value):
+    left, right = value >> HALF_BITS, value & HALF_MASK
+    for index in range(ROUNDS):
+        left, right = right, left ^ _round(key, index, right)
+    return (left << HALF_BITS) | right
+
+
+def permute(key, number):
+    """Map a number in [0, 2**39) to a unique number in the same range."""
+    if not 0 <= number < (1 << SPACE_BITS):
+        raise ValueError('Reference sequence exhausted')
+    # Cycle-walk the 40-bit permutation until it lands back inside the 39-bit space
+    value = _feistel(key, number)
+    while value >> SPACE_BITS:
+        value = _feistel(key, value)
+    return value
+
+
+def encode(value):
+    value |= 1 << SPACE_BITS
+    chars = []
+    for _ in range(LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class ReferenceGenerator:
+    def __init__(self, key, allocate_block, block_size=100):
+        """`allocate_block(size)` must atomically reserve and return (start, end)."""
+        self.key = hashlib.sha256(key.encode('utf-8')).digest()
+        self.allocate_block = allocate_block
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def next_reference(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self.allocate_block(self.block_size)
+            number = self._next
+            self._next += 1
+        return encode(permute(self.key, number))
@@ -0,0 +1,197 @@
+"""Admin reports: definitions, date bucketing and a result cache.
+
+A Report declares its columns and a query function taking (start, end,
+bucket). Running it yields a ReportResult, which the HTML page, the JSON API
+and the CSV export all render, so a report is computed once however it is
+viewed. Results are cached per (report, start, end, bucket) for a few seconds
+up to a bounded number of entries; concurrent requests for the same key wait
+for the one computing it rather than running the query again.
+
+Ranges are whole days, start and end inclusive. Time series are queried per
+day and summed into weeks (starting Monday) or calendar months here, so the
+SQL stays the same on every database.
+"""
+import csv
+import io
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, timedelta
+
+BUCKETS = ('day', 'week', 'month')
+
+Column = namedtuple('Column', ['key', 'label', 'kind'])  # kind: 'text', 'count' or 'money'
+ReportResult = namedtuple('ReportResult', ['name', 'title', 'start', 'end', 'bucket', 'columns', 'rows'])
+
+
+class Report:
+    def __init__(self, name, title, columns, query, bucketed=False):
+        """`query(start, end, bucket)` returns rows as tuples in column order.
+
+        A bucketed report's query returns one row per day instead, starting with
+        the date; run() sums them into buckets.
+        """
+        self.name = name
+        self.title = title
+        self.columns = columns
+        self.query = query
+        self.bucketed = bucketed
+
+    def run(self, start, end, bucket):
+        rows = self.query(start, end, bucket)
+        if self.bucketed:
+            rows = bucket_totals(rows, start, end, bucket, len(self.columns) - 1)
+        return ReportResult(
+            name=self.name,
+            title=self.title,
+            start=start,
+            end=end,
+            bucket=bucket,
+            columns=self.columns,
+            rows=[tuple(row) for row in rows]
+        )
+
+
+# Ranges and buckets
+
+def parse_range(start, end, period, today, max_days):
+    """(start, end) dates from ISO strings, or the last `period` days up to today."""
+    try:
+        end = date.fromisoformat(end) if end else today
+        start = date.fromisoformat(start) if start else end - timedelta(days=int(period))
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD and period a number of days')
+    if start > end:
+        raise ValueError('The start date is after the end date')
+    if (end - start).days >= max_days:
+        raise ValueError(f'Reports cover at most {max_days} days')
+    return start, end
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start, bucket):
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_totals(daily_rows, start, end, bucket, width):
+    """Sum (day, value, ...) rows into one row per bucket, with `width` zeros for empty buckets."""
+    totals = OrderedDict()
+    period = bucket_start(start, bucket)
+    while period <= end:
+        totals[period] = None
+        period = _next_bucket(period, bucket)
+    for day, *values in daily_rows:
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        period = bucket_start(day, bucket)
+        current = totals.get(period)
+        totals[period] = values if current is None else [a + b for a, b in zip(current, values)]
+    return [(period.isoformat(), *(values or [0] * width)) for period, values in totals.items()]
+
+
+# Result cache
+
+class ReportCache:
+    def __init__(self, ttl=60, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires, result)
+        self._computing = {}  # key -> lock held while the result is computed
+        self._lock = threading.Lock()
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def get(self, key, compute):
+        """The cached result for `key`, calling compute() once when it is missing or stale."""
+        with self._lock:
+            result = self._get(key, time.monotonic())
+            if result is not None:
+                self.hits += 1
+                return result
+            key_lock = self._computing.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another request may have computed it while this one waited
+            with self._lock:
+                result = self._get(key, time.monotonic())
+                if result is not None:
+                    self.hits += 1
+                    return result
+                self.misses += 1
+            try:
+                result = compute()
+                # Store before dropping the key lock, or a request arriving in
+                # between would find neither and compute the report again
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl, result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                return result
+            finally:
+                with self._lock:
+                    self._computing.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Renderers
+
+def _value(value, kind):
+    if kind == 'money':
+        return round(float(value or 0), 2)
+    if kind == 'count':
+        return int(value or 0)
+    return value
+
+
+def result_json(result):
+    return {
+        'report': result.name,
+        'title': result.title,
+        'start': result.start.isoformat(),
+        'end': result.end.isoformat(),
+        'bucket': result.bucket,
+        'columns': [{'key': column.key, 'label': column.label} for column in result.columns],
+        'rows': [
+            {column.key: _value(value, column.kind) for column, value in zip(result.columns, row)}
+            for row in result.rows
+        ]
+    }
+
+
+def result_csv(result):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([column.label for column in result.columns])
+    for row in result.rows:
+        writer.writerow([_value(value, column.kind) for column, value in zip(result.columns, row)])
+    return out.getvalue()
+
+
+def result_totals(result):
+    """Column totals for count and money columns, keyed by column key."""
+    return {
+        column.key: sum(_value(row[index], column.kind) for row in result.rows)
+        for index, column in enumerate(result.columns) if column.kind in ('count', 'money')
+    }
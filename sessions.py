@@ -0,0 +1,225 @@
+"""Server-side sessions.
+
+The cookie only carries a random session id. The data lives in a store shared
+by every worker and node: SQLiteSessionStore (a local file, for development)
+or DatabaseSessionStore (a table in the main database). Each worker keeps an
+LRU of recently used sessions, so hot sessions rarely touch the store. The
+LRU holds a session for at most `cache_ttl` seconds, which bounds how long
+another node's logout can go unnoticed. Saves only update an existing
+session's row, so a session deleted elsewhere is never written back from a
+stale cache, and login moves the data to a fresh id (regenerate()).
+
+Sessions expire PERMANENT_SESSION_LIFETIME after they were last saved. Active
+sessions are re-saved once half their lifetime has passed, and expired rows
+are swept every `sweep_interval` seconds.
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from sqlalchemy import select
+from werkzeug.datastructures import CallbackDict
+
+serializer = TaggedJSONSerializer()
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires = expires
+        self.new = sid is None
+        self.modified = False
+        self.regenerate_sid = False
+
+    def regenerate(self):
+        """Move the data to a new session id when the response is saved (call at login)."""
+        self.regenerate_sid = True
+        self.modified = True
+
+
+class SQLiteSessionStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def load(self, sid):
+        row = self._connection().execute('SELECT data, expires FROM sessions WHERE id = ?', (sid,)).fetchone()
+        return (serializer.loads(row[0]), row[1]) if row else None
+
+    def insert(self, sid, data, expires):
+        with self._connection() as conn:
+            conn.execute('INSERT INTO sessions (id, data, expires) VALUES (?, ?, ?)',
+                         (sid, serializer.dumps(data), expires))
+
+    def update(self, sid, data, expires):
+        """Returns False if the session no longer exists."""
+        with self._connection() as conn:
+            return conn.execute('UPDATE sessions SET data = ?, expires = ? WHERE id = ?',
+                                (serializer.dumps(data), expires, sid)).rowcount == 1
+
+    def delete(self, sid):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM sessions WHERE id = ?', (sid,))
+
+    def sweep(self, now):
+        with self._connection() as conn:
+            return conn.execute('DELETE FROM sessions WHERE expires < ?', (now,)).rowcount
+
+
+class DatabaseSessionStore:
+    def __init__(self, table, get_engine):
+        """`table` needs id, data and expires_at columns; `get_engine()` returns the primary engine."""
+        self.table = table
+        self.get_engine = get_engine
+
+    def load(self, sid):
+        table = self.table
+        with self.get_engine().connect() as conn:
+            row = conn.execute(select(table.c.data, table.c.expires_at).where(table.c.id == sid)).first()
+        if row is None:
+            return None
+        return serializer.loads(row.data), (row.expires_at - datetime(1970, 1, 1)).total_seconds()
+
+    @staticmethod
+    def _values(data, expires):
+        return {'data': serializer.dumps(data), 'expires_at': datetime.utcfromtimestamp(expires)}
+
+    def insert(self, sid, data, expires):
+        with self.get_engine().begin() as conn:
+            conn.execute(self.table.insert().values(id=sid, **self._values(data, expires)))
+
+    def update(self, sid, data, expires):
+        """Returns False if the session no longer exists."""
+        table = self.table
+        with self.get_engine().begin() as conn:
+            return conn.execute(table.update().where(table.c.id == sid).values(**self._values(data, expires))).rowcount == 1
+
+    def delete(self, sid):
+        with self.get_engine().begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.id == sid))
+
+    def sweep(self, now):
+        with self.get_engine().begin() as conn:
+            return conn.execute(self.table.delete().where(self.table.c.expires_at < datetime.utcfromtimestamp(now))).rowcount
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, store, cache_size=10000, cache_ttl=5, sweep_interval=300):
+        self.store = store
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.sweep_interval = sweep_interval
+        self._cache = OrderedDict()     # sid -> (data, expires, cached_at)
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    def _cached(self, sid, now):
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is None:
+                return None
+            if entry[2] + self.cache_ttl < now:
+                del self._cache[sid]
+                return None
+            self._cache.move_to_end(sid)
+            return entry
+
+    def _cache_put(self, sid, data, expires, now):
+        with self._lock:
+            self._cache[sid] = (data, expires, now)
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name)
+        if sid:
+            now = time.time()
+            entry = self._cached(sid, now)
+            if entry is None:
+                loaded = self.store.load(sid)
+                if loaded is not None:
+                    entry = (loaded[0], loaded[1], now)
+                    self._cache_put(sid, loaded[0], loaded[1], now)
+            if entry is not None and entry[1] > now:
+                return ServerSideSession(dict(entry[0]), sid=sid, expires=entry[1])
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = app.session_cookie_name
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.sid is not None:
+                # Emptied (e.g. logout): drop it everywhere
+                self.store.delete(session.sid)
+                self._forget(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        if session.sid is not None and session.regenerate_sid:
+            # Retire the old id, so one planted before login can't follow the session
+            self.store.delete(session.sid)
+            self._forget(session.sid)
+            session.sid = None
+
+        if session.sid is not None:
+            response.vary.add('Cookie')
+            # Unchanged sessions are only re-saved to push their expiry back
+            if not session.modified and session.expires - now > lifetime / 2:
+                return
+            data = dict(session)
+            if not self.store.update(session.sid, data, now + lifetime):
+                # Logged out (perhaps on another worker) or expired since this worker cached it.
+                # Never write it back; the client gets a new id when it next has session data.
+                self._forget(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+                return
+        else:
+            session.sid = secrets.token_urlsafe(32)
+            data = dict(session)
+            self.store.insert(session.sid, data, now + lifetime)
+        session.expires = now + lifetime
+        self._cache_put(session.sid, data, session.expires, now)
+
+        response.set_cookie(
+            name, session.sid,
+            expires=datetime.utcfromtimestamp(session.expires) if session.permanent else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+        response.vary.add('Cookie')
+
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.store.sweep(now)
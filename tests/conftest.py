@@ -0,0 +1,68 @@
+"""Shared fixtures: the app running against a seeded SQLite database.
+
+Tests use a throwaway SQLite file unless TEST_DATABASE_URL is set (e.g. to a
+MySQL test database in CI).
+"""
+import os
+import tempfile
+
+import pytest
+
+import app as ht
+from tests.query_budget import query_budget as _query_budget
+from tests.seed import seed_database
+
+_db_dir = tempfile.mkdtemp(prefix='ht_test_')
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL', f'sqlite:///{os.path.join(_db_dir, "ht_booking.db")}')
+
+SEED_USERS = int(os.environ.get('TEST_SEED_USERS', 500))
+SEED_BOOKINGS = int(os.environ.get('TEST_SEED_BOOKINGS', 20000))
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The app under test, on the throwaway database."""
+    return ht.create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL})
+
+
+@pytest.fixture(scope='session')
+def seeded_db(app):
+    """Users and bookings spread over the seeded routes, inserted once per test run."""
+    with app.app_context():
+        ht.init_db()
+    return seed_database(ht, app, SEED_USERS, SEED_BOOKINGS)
+
+
+@pytest.fixture
+def client(app, seeded_db):
+    return app.test_client()
+
+
+def _login(app, user_id, is_admin=False):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['is_admin'] = is_admin
+    return client
+
+
+@pytest.fixture
+def login():
+    """Log in to another app: login(app, user_id, is_admin=False) returns its test client."""
+    return _login
+
+
+@pytest.fixture
+def admin_client(app, seeded_db):
+    return _login(app, seeded_db['admin_id'], is_admin=True)
+
+
+@pytest.fixture
+def customer_client(app, seeded_db):
+    return _login(app, seeded_db['customer_id'])
+
+
+@pytest.fixture
+def query_budget():
+    """The query_budget context manager, as a fixture."""
+    return _query_budget
@@ -0,0 +1,224 @@
+"""Booking endpoints: payload validation, seat inventory and batch bookings."""
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import app as ht
+
+
+def _route(app, index=0):
+    with app.app_context():
+        return ht.get_catalog().routes[index]
+
+
+def _request(route, passengers, journey_date):
+    return {
+        'from': route.from_city.name,
+        'to': route.to_city.name,
+        'travel_mode': route.mode,
+        'departure_date': journey_date.isoformat(),
+        'passengers': passengers,
+        'seat_class': 'standard'
+    }
+
+
+def _seats_remaining(app, route, journey_date):
+    with app.app_context():
+        return ht.SeatInventory.query.get((route.id, journey_date)).seats_remaining
+
+
+def _book(client, route, passengers, journey_date):
+    response = client.post('/api/booking', json=_request(route, passengers, journey_date))
+    if response.status_code != 200:
+        return response, None
+    return response, int(response.get_json()['redirect'].rsplit('/', 1)[1])
+
+
+def test_quote_reports_items_that_are_not_objects(app, client):
+    route = _route(app)
+    good = {'route_id': route.id, 'departure_date': (date.today() + timedelta(days=10)).isoformat()}
+    response = client.post('/api/quote', json={'items': [good, 7, 'x', None, [1]]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['quotes']) == 1
+    assert [error['index'] for error in body['errors']] == [1, 2, 3, 4]
+    assert client.post('/api/quote', json=[good]).status_code == 400
+
+
+def test_batch_reports_items_that_are_not_objects_or_have_bad_fields(app, customer_client):
+    route = _route(app)
+    response = customer_client.post('/api/bookings/batch', json={'mode': 'all_or_nothing', 'bookings': [
+        7,
+        None,
+        {'from': [route.from_city.name], 'to': route.to_city.name, 'travel_mode': route.mode,
+         'departure_date': '2030-01-01', 'passengers': 1, 'seat_class': 'standard'}
+    ]})
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [0, 1, 2]
+
+
+def test_sold_out_route_rejects_bookings_until_one_is_cancelled(app, customer_client):
+    route = _route(app, 1)
+    journey_date = date.today() + timedelta(days=400)
+
+    # The first sale creates the inventory row from the route's capacity
+    response, _ = _book(customer_client, route, 1, journey_date)
+    assert response.status_code == 200
+    remaining = _seats_remaining(app, route, journey_date)
+    assert remaining == route.available_seats - 1
+
+    # Sell the rest, keeping a two-seat booking to cancel later
+    assert _book(customer_client, route, remaining - 2, journey_date)[0].status_code == 200
+    response, last = _book(customer_client, route, 2, journey_date)
+    assert response.status_code == 200
+    assert _seats_remaining(app, route, journey_date) == 0
+
+    response, _ = _book(customer_client, route, 1, journey_date)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Not enough seats available for this route'
+    assert _seats_remaining(app, route, journey_date) == 0
+
+    # Cancelling frees exactly that booking's seats
+    assert customer_client.post(f'/cancel-booking/{last}').status_code == 302
+    assert _seats_remaining(app, route, journey_date) == 2
+    assert _book(customer_client, route, 3, journey_date)[0].status_code == 400
+    assert _book(customer_client, route, 2, journey_date)[0].status_code == 200
+    assert _seats_remaining(app, route, journey_date) == 0
+
+
+def test_availability_is_fresh_right_after_a_booking(app, client, customer_client, monkeypatch):
+    route = _route(app, 5)
+    journey_date = date.today() + timedelta(days=470)
+
+    def seats_remaining():
+        day = journey_date.isoformat()
+        response = client.get('/api/availability', query_string={'route_id': route.id, 'from': day, 'to': day})
+        return response.get_json()['days'][0]['seats_remaining']
+
+    # Another request reads availability after the seats are taken but before they are committed
+    record_booking_rollups = ht.record_booking_rollups
+    def read_before_commit(*args, **kwargs):
+        reader = threading.Thread(target=seats_remaining)
+        reader.start()
+        reader.join()
+        return record_booking_rollups(*args, **kwargs)
+    monkeypatch.setattr(ht, 'record_booking_rollups', read_before_commit)
+
+    assert seats_remaining() == route.available_seats
+    assert _book(customer_client, route, 2, journey_date)[0].status_code == 200
+    assert seats_remaining() == route.available_seats - 2
+
+
+def _customer_bookings(app, seeded_db):
+    with app.app_context():
+        return ht.Booking.query.filter_by(user_id=seeded_db['customer_id']).count()
+
+
+def _batch(client, mode, bookings):
+    return client.post('/api/bookings/batch', json={'mode': mode, 'bookings': bookings})
+
+
+def _oversold_batch(app, customer_client, days):
+    """A batch of two bookings that fit and one that can't, after a first sale on each journey."""
+    fits, full = _route(app, 2), _route(app, 3)
+    journey_date = date.today() + timedelta(days=days)
+    for route in (fits, full):
+        assert _book(customer_client, route, 1, journey_date)[0].status_code == 200
+    bookings = [
+        _request(fits, 2, journey_date),
+        _request(full, full.available_seats, journey_date),
+        _request(fits, 3, journey_date),
+    ]
+    return fits, full, journey_date, bookings
+
+
+def test_all_or_nothing_batch_rolls_back_every_reservation(app, customer_client, seeded_db):
+    fits, full, journey_date, bookings = _oversold_batch(app, customer_client, 420)
+    before = _customer_bookings(app, seeded_db)
+
+    response = _batch(customer_client, 'all_or_nothing', bookings)
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 1, 'error': 'Not enough seats available for this route'}]
+    assert _customer_bookings(app, seeded_db) == before
+    assert _seats_remaining(app, fits, journey_date) == fits.available_seats - 1
+    assert _seats_remaining(app, full, journey_date) == full.available_seats - 1
+
+
+def test_best_effort_batch_books_what_fits(app, customer_client, seeded_db):
+    fits, full, journey_date, bookings = _oversold_batch(app, customer_client, 430)
+    before = _customer_bookings(app, seeded_db)
+
+    response = _batch(customer_client, 'best_effort', bookings)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [booking['index'] for booking in body['bookings']] == [0, 2]
+    assert body['errors'] == [{'index': 1, 'error': 'Not enough seats available for this route'}]
+    assert _customer_bookings(app, seeded_db) == before + 2
+    assert _seats_remaining(app, fits, journey_date) == fits.available_seats - 6
+    assert _seats_remaining(app, full, journey_date) == full.available_seats - 1
+
+    with app.app_context():
+        booked = ht.Booking.query.filter(ht.Booking.id.in_([booking['booking_id'] for booking in body['bookings']])).all()
+        assert sorted(booking.passengers for booking in booked) == [2, 3]
+        assert {booking.reference for booking in booked} == {booking['reference'] for booking in body['bookings']}
+
+
+@pytest.mark.parametrize('batch_size', [1, 5])
+def test_batch_claims_new_reference_blocks(app, customer_client, monkeypatch, batch_size):
+    # A fresh worker has no block yet, and a batch can need more than one
+    generator = ht.ReferenceGenerator(app.config['REFERENCE_KEY'], ht._allocate_reference_block, block_size=2)
+    monkeypatch.setattr(app.extensions['horizon'], 'reference_generator', generator)
+    route = _route(app, 4)
+    journey_date = date.today() + timedelta(days=440 + batch_size)
+
+    response = _batch(customer_client, 'all_or_nothing', [_request(route, 1, journey_date)] * batch_size)
+    assert response.status_code == 200, response.get_json()
+    references = [booking['reference'] for booking in response.get_json()['bookings']]
+    assert len(set(references)) == batch_size
+
+
+def _ledger(app, booking_id):
+    """Seats left on a booking's journey and the rollup rows it counts towards."""
+    with app.app_context():
+        booking = ht.Booking.query.get(booking_id)
+        daily = ht.BookingRollup.query.get((booking.created_at.date(), booking.route_id, booking.route.mode, booking.class_type))
+        spend = ht.UserSpendRollup.query.get(booking.user_id)
+        return (
+            ht.SeatInventory.query.get((booking.route_id, booking.journey_date)).seats_remaining,
+            (daily.bookings, daily.passengers),
+            (spend.bookings, spend.passengers)
+        )
+
+
+def test_second_cancel_changes_nothing(app, customer_client):
+    route = _route(app, 5)
+    journey_date = date.today() + timedelta(days=450)
+    booking_id = _book(customer_client, route, 2, journey_date)[1]
+    seats, daily, spend = _ledger(app, booking_id)
+
+    assert customer_client.post(f'/cancel-booking/{booking_id}').status_code == 302
+    cancelled = _ledger(app, booking_id)
+    assert cancelled == (seats + 2, (daily[0] - 1, daily[1] - 2), (spend[0] - 1, spend[1] - 2))
+
+    assert customer_client.post(f'/cancel-booking/{booking_id}').status_code == 302
+    assert _ledger(app, booking_id) == cancelled
+
+
+def test_cancel_racing_another_cancel_changes_nothing(app, customer_client, monkeypatch):
+    route = _route(app, 5)
+    journey_date = date.today() + timedelta(days=460)
+    booking_id = _book(customer_client, route, 2, journey_date)[1]
+    before = _ledger(app, booking_id)
+
+    # Another request cancels the booking after this one has checked its status
+    get_pricing_rules = ht.get_pricing_rules
+    def cancel_elsewhere():
+        table = ht.Booking.__table__
+        with ht.db.get_engine(app).begin() as conn:
+            conn.execute(table.update().where(table.c.id == booking_id).values(status='cancelled'))
+        return get_pricing_rules()
+    monkeypatch.setattr(ht, 'get_pricing_rules', cancel_elsewhere)
+
+    assert customer_client.post(f'/cancel-booking/{booking_id}').status_code == 302
+    assert _ledger(app, booking_id) == before
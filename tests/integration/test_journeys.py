@@ -0,0 +1,84 @@
+"""JourneyPlanner over small fixed timetables."""
+from collections import namedtuple
+from datetime import datetime, time
+
+from journeys import JourneyPlanner
+
+City = namedtuple('City', ['id', 'name'])
+Route = namedtuple('Route', [
+    'id', 'from_city_id', 'to_city_id', 'from_city', 'to_city', 'mode',
+    'departure_time', 'arrival_time', 'standard_fare', 'business_fare'
+])
+
+CITIES = {name: City(index, name) for index, name in enumerate(['A', 'B', 'C', 'D'], start=1)}
+MONDAY_8AM = datetime(2030, 1, 7, 8, 0)
+
+
+def _route(route_id, origin, destination, departure, arrival, fare=10, mode='train'):
+    return Route(
+        route_id, CITIES[origin].id, CITIES[destination].id, CITIES[origin], CITIES[destination], mode,
+        time(*departure), time(*arrival), fare, fare * 2
+    )
+
+
+def _search(routes, origin, destination, **kwargs):
+    planner = JourneyPlanner(routes, min_connection=kwargs.pop('min_connection', 30))
+    return planner.search(CITIES[origin].id, CITIES[destination].id, MONDAY_8AM, **kwargs)
+
+
+def _route_ids(journey):
+    return [leg['route_id'] for leg in journey['legs']]
+
+
+def test_overnight_service_arrives_the_next_day():
+    journeys = _search([_route(1, 'A', 'B', (22, 0), (6, 0))], 'A', 'B')
+    assert len(journeys) == 1
+    assert journeys[0]['departure'] == '2030-01-07T22:00'
+    assert journeys[0]['arrival'] == '2030-01-08T06:00'
+    assert journeys[0]['duration_minutes'] == 8 * 60
+
+
+def test_connections_respect_the_minimum_connection_time():
+    routes = [
+        _route(1, 'A', 'B', (9, 0), (10, 0)),
+        _route(2, 'B', 'C', (10, 20), (11, 0)),    # 20 minutes after arriving
+        _route(3, 'B', 'C', (10, 45), (11, 30)),   # 45 minutes after arriving
+    ]
+    assert _route_ids(_search(routes, 'A', 'C')[0]) == [1, 3]
+    assert _route_ids(_search(routes, 'A', 'C', min_connection=15)[0]) == [1, 2]
+
+
+def test_changing_mode_needs_the_longer_connection():
+    routes = [
+        _route(1, 'A', 'B', (9, 0), (10, 0)),
+        _route(2, 'B', 'C', (10, 45), (11, 30), mode='air'),   # 45 minutes: too short to change mode
+        _route(3, 'B', 'C', (11, 0), (11, 45), mode='air'),
+    ]
+    assert [_route_ids(journey) for journey in _search(routes, 'A', 'C')] == [[1, 3]]
+
+
+def test_only_non_dominated_journeys_are_returned():
+    routes = [
+        _route(1, 'A', 'C', (9, 0), (15, 0), fare=100),    # direct
+        _route(2, 'A', 'C', (9, 30), (16, 0), fare=150),   # direct, later and dearer than route 1
+        _route(3, 'A', 'B', (9, 0), (10, 0), fare=20),
+        _route(4, 'B', 'C', (11, 0), (12, 0), fare=20),    # with route 3: earlier and cheaper, one change
+    ]
+    earliest = _search(routes, 'A', 'C', passengers=2)
+    assert [_route_ids(journey) for journey in earliest] == [[3, 4], [1]]
+    assert [journey['total_fare'] for journey in earliest] == [80, 200]
+
+    assert [_route_ids(journey) for journey in _search(routes, 'A', 'C', objective='cheapest')] == [[3, 4], [1]]
+    assert [_route_ids(journey) for journey in _search(routes, 'A', 'C', objective='fewest_changes')] == [[1], [3, 4]]
+
+
+def test_journeys_are_limited_to_max_legs():
+    routes = [
+        _route(1, 'A', 'B', (9, 0), (10, 0)),
+        _route(2, 'B', 'C', (11, 0), (12, 0)),
+        _route(3, 'C', 'D', (13, 0), (14, 0)),
+    ]
+    assert _search(routes, 'A', 'D', max_legs=2) == []
+    journeys = _search(routes, 'A', 'D', max_legs=3)
+    assert [_route_ids(journey) for journey in journeys] == [[1, 2, 3]]
+    assert journeys[0]['changes'] == 2
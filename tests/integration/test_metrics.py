@@ -0,0 +1,41 @@
+"""Request metrics recorded from short-lived threads."""
+import threading
+
+from metrics import MetricsRegistry
+
+
+def _observe(registry, count):
+    for _ in range(count):
+        registry.observe('index', 'GET', 200, 0.01, 2, 0.002)
+
+
+def test_exited_threads_are_folded_into_the_totals():
+    registry = MetricsRegistry()
+    for _ in range(50):
+        thread = threading.Thread(target=_observe, args=(registry, 3))
+        thread.start()
+        thread.join()
+    _observe(registry, 1)
+
+    text = registry.render()
+    assert f'http_requests_total{{worker="{registry.worker}",endpoint="index",method="GET",status="200"}} 151' in text
+    assert f'db_statements_per_request_count{{worker="{registry.worker}",endpoint="index"}} 151' in text
+    # Only this thread is still registered; the others live on in the retired totals
+    assert list(registry._threads) == [threading.current_thread()]
+    # Scraping again doesn't count the retired threads twice
+    assert registry.render() == text
+
+
+def _statements_sum(app, endpoint):
+    metrics = app.extensions['horizon'].metrics
+    prefix = f'db_statements_per_request_sum{{worker="{metrics.worker}",endpoint="{endpoint}"}} '
+    lines = [line for line in metrics.render().splitlines() if line.startswith(prefix)]
+    return float(lines[0][len(prefix):]) if lines else 0.0
+
+
+def test_async_view_statements_count_towards_the_request(app, admin_client):
+    # The dashboard aggregates run on the async database's loop thread
+    admin_client.get('/admin/api/stats')
+    before = _statements_sum(app, 'main.admin_stats')
+    assert admin_client.get('/admin/api/stats').status_code == 200
+    assert _statements_sum(app, 'main.admin_stats') - before >= 5
@@ -0,0 +1,109 @@
+"""Migrations and the index advisor against the seeded database."""
+import os
+import subprocess
+import sys
+from datetime import date
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+import app as ht
+from indexadvisor import Finding, Proposal, explain, merge, propose
+
+
+def test_models_match_migrations(app, seeded_db):
+    # A model change without a migration (or the reverse) shows up as a difference
+    with app.app_context(), ht.db.engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), ht.db.metadata) == []
+
+
+# The schema create_all() made before migrations existed
+BASELINE_SCHEMA = [
+    'CREATE TABLE cities (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(50) NOT NULL, created_at DATETIME)',
+    'CREATE TABLE users (id INTEGER NOT NULL PRIMARY KEY, first_name VARCHAR(50) NOT NULL, '
+    'last_name VARCHAR(50) NOT NULL, email VARCHAR(100) NOT NULL, phone VARCHAR(20) NOT NULL, '
+    'password VARCHAR(255) NOT NULL, is_admin BOOLEAN, created_at DATETIME, UNIQUE (email))',
+    'CREATE TABLE routes (id INTEGER NOT NULL PRIMARY KEY, from_city_id INTEGER NOT NULL REFERENCES cities (id), '
+    'to_city_id INTEGER NOT NULL REFERENCES cities (id), mode VARCHAR(5) NOT NULL, departure_time TIME NOT NULL, '
+    'arrival_time TIME NOT NULL, standard_fare NUMERIC(10, 2) NOT NULL, business_fare NUMERIC(10, 2) NOT NULL, '
+    'available_seats INTEGER NOT NULL, created_at DATETIME)',
+    'CREATE TABLE bookings (id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users (id), '
+    'route_id INTEGER NOT NULL REFERENCES routes (id), reference VARCHAR(10) NOT NULL, '
+    'journey_date DATE NOT NULL, passengers INTEGER NOT NULL, class_type VARCHAR(8) NOT NULL, '
+    'base_price NUMERIC(10, 2) NOT NULL, class_upgrade NUMERIC(10, 2) NOT NULL, discount NUMERIC(10, 2) NOT NULL, '
+    'total_price NUMERIC(10, 2) NOT NULL, status VARCHAR(9), created_at DATETIME, UNIQUE (reference))',
+    "INSERT INTO cities (id, name) VALUES (1, 'London'), (2, 'Manchester')",
+    "INSERT INTO users (id, first_name, last_name, email, phone, password, is_admin) "
+    "VALUES (1, 'Ada', 'Lovelace', 'ada@example.com', '07000000000', 'x', 0)",
+    "INSERT INTO routes (id, from_city_id, to_city_id, mode, departure_time, arrival_time, standard_fare, "
+    "business_fare, available_seats) VALUES (1, 1, 2, 'train', '09:30:00.000000', '11:30:00.000000', 60, 120, 10)",
+    "INSERT INTO bookings (user_id, route_id, reference, journey_date, passengers, class_type, base_price, "
+    "class_upgrade, discount, total_price, status, created_at) VALUES "
+    "(1, 1, 'BK000001', '2030-05-15', 3, 'standard', 60, 0, 0, 180, 'confirmed', '2030-01-02 10:00:00.000000'), "
+    "(1, 1, 'BK000002', '2030-05-15', 2, 'standard', 60, 0, 0, 120, 'confirmed', '2030-01-02 11:00:00.000000'), "
+    "(1, 1, 'BK000003', '2030-05-15', 4, 'standard', 60, 0, 0, 240, 'cancelled', '2030-01-03 10:00:00.000000')"
+]
+
+
+def test_baseline_database_is_upgraded(tmp_path):
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+
+    env = dict(os.environ, DATABASE_URL=url, FLASK_APP='app', SESSION_BACKEND='cookie', REFERENCE_KEY='test')
+    subprocess.run([sys.executable, '-m', 'flask', 'init-db'], cwd=os.path.dirname(os.path.abspath(ht.__file__)), env=env,
+                   check=True, capture_output=True)
+
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), ht.db.metadata) == []
+        assert conn.exec_driver_sql('SELECT seats_remaining FROM seat_inventory').all() == [(5,)]
+        assert conn.exec_driver_sql('SELECT bookings, passengers, spent FROM user_spend_rollup').all() == [(2, 5, 300)]
+        assert conn.exec_driver_sql(
+            'SELECT day, bookings, revenue FROM booking_daily_rollup'
+        ).all() == [('2030-01-02', 2, 300)]
+
+
+def _explain(app, statement):
+    """EXPLAIN a SQLAlchemy statement as this database's dialect renders it."""
+    with app.app_context(), ht.db.engine.connect() as conn:
+        compiled = statement.compile(dialect=conn.dialect)
+        parameters = [compiled.params[name] for name in compiled.positiontup] if compiled.positional else compiled.params
+        return explain(conn, str(compiled), parameters)
+
+
+def test_unindexed_filter_gets_a_proposal(app, seeded_db):
+    Booking = ht.Booking
+    findings = _explain(app, ht.db.select(Booking.id).where(
+        Booking.passengers == 2, Booking.total_price > 100
+    ).order_by(Booking.journey_date))
+    assert {finding.problem for finding in findings} == {'full scan', 'filesort'}
+    assert propose(findings[0], {'bookings': ['id']}) == Proposal('bookings', ('passengers', 'total_price'))
+
+
+def test_indexed_dashboard_page_is_not_flagged(app, seeded_db):
+    Booking = ht.Booking
+    assert _explain(app, ht.db.select(Booking.id).where(
+        Booking.user_id == seeded_db['customer_id'],
+        Booking.journey_date >= date.today(),
+        Booking.status != 'cancelled'
+    ).order_by(Booking.journey_date, Booking.id).limit(11)) == []
+
+
+def test_or_and_keyset_conditions_do_not_lead_the_index():
+    statement = ('SELECT bookings.id FROM bookings AS bookings_1 WHERE bookings_1.user_id = ? '
+                 'AND (bookings_1.journey_date < ? OR bookings_1.status = ?) '
+                 'AND (bookings_1.journey_date < ? OR bookings_1.journey_date = ? AND bookings_1.id < ?) '
+                 'ORDER BY bookings_1.journey_date DESC, bookings_1.id DESC LIMIT ?')
+    proposal = propose(Finding(statement, 'bookings_1', 'full scan', ''), {'bookings': ['id']})
+    assert proposal == Proposal('bookings', ('user_id', 'journey_date'))
+
+
+def test_covered_proposals_are_dropped():
+    proposals = [Proposal('bookings', ('user_id',)), Proposal('bookings', ('user_id', 'journey_date')),
+                 Proposal('bookings', ('reference',)), Proposal('users', ('created_at',))]
+    existing = {'bookings': [('reference',)], 'users': [('id',)]}
+    assert merge(proposals, existing) == [Proposal('bookings', ('user_id', 'journey_date')),
+                                          Proposal('users', ('created_at',))]
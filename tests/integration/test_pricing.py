@@ -0,0 +1,25 @@
+"""The pricing rules in ht_booking.sql and the ones `flask seed` inserts."""
+import os
+import re
+
+import app as ht
+from pricing import PricingRules
+
+SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(ht.__file__)), 'ht_booking.sql')
+
+
+def _sql_rows(table):
+    with open(SQL_PATH) as f:
+        sql = f.read()
+    values = re.search(rf'INSERT INTO {table} \([^)]*\) VALUES(.*?);', sql, re.S).group(1)
+    return [(int(low), int(high), float(percentage)) for low, high, percentage in re.findall(
+        r'\((\d+),\s*(\d+),\s*([\d.]+)\)', values
+    )]
+
+
+def test_sql_and_seed_rules_price_the_same():
+    sql = PricingRules(_sql_rows('Discounts'), _sql_rows('CancellationRules'))
+    seed = PricingRules(ht.DEFAULT_DISCOUNTS, ht.DEFAULT_CANCELLATION_RULES)
+    for days in range(-1, 400):
+        assert sql.quote(120, 2, days) == seed.quote(120, 2, days), days
+        assert sql.cancellation_charge(240, days) == seed.cancellation_charge(240, days), days
@@ -0,0 +1,99 @@
+"""Per-endpoint SQL statement budgets.
+
+Budgets are what each page costs today against the seeded database. A change
+that adds statements, or lazy-loads inside a template loop, fails here.
+"""
+import time
+
+import pytest
+
+import app as ht
+from tests.query_budget import QueryBudgetExceeded, query_budget
+
+
+def test_admin_dashboard(admin_client):
+    with query_budget(10):
+        response = admin_client.get('/admin')
+    assert response.status_code == 200
+
+
+def test_admin_stats(admin_client):
+    # The five dashboard aggregates, plus up to three for a cold catalog
+    with query_budget(8):
+        response = admin_client.get('/admin/api/stats')
+    assert response.status_code == 200
+    assert set(response.get_json()) == {'stats', 'sales_by_type', 'top_routes', 'top_customers'}
+
+
+def test_user_dashboard(customer_client):
+    with query_budget(4):
+        response = customer_client.get('/user-dashboard')
+    assert response.status_code == 200
+
+
+def test_user_dashboard_later_page(customer_client):
+    # Deep pages seek straight to the cursor, so they cost the same as the first
+    with query_budget(4):
+        response = customer_client.get('/user-dashboard', query_string={'past_before': '2000-01-01.1'})
+    assert response.status_code == 200
+
+
+class _ArrivesAsComputed(dict):
+    """ReportCache._computing, noting what a request arriving just as a
+    computation finishes would find."""
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.found = []
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self.found.append(self.cache._get(key, time.monotonic()))
+        return value
+
+
+def test_admin_report_is_computed_once(app, admin_client, monkeypatch):
+    # The page, the JSON API and the CSV export share one cached result
+    args = {'report_type': 'monthly-sales', 'period': 365, 'bucket': 'week'}
+    cache = app.extensions['horizon'].report_cache
+    waiter = _ArrivesAsComputed(cache)
+    monkeypatch.setattr(cache, '_computing', waiter)
+    with query_budget(3):
+        response = admin_client.get('/admin/reports', query_string=args)
+    assert response.status_code == 200
+    # A request arriving once the computation is no longer in progress finds its result
+    assert len(waiter.found) == 1 and waiter.found[0] is not None
+    with query_budget(1):
+        assert admin_client.get('/admin/reports', query_string=args).status_code == 200
+        assert admin_client.get('/admin/api/reports/monthly-sales', query_string=args).status_code == 200
+        assert admin_client.post('/admin/export-report', data=args).status_code == 200
+
+
+def test_destinations(client):
+    # A cold catalog costs one version check plus the cities and routes loads
+    with query_budget(3):
+        response = client.get('/destinations')
+    assert response.status_code == 200
+
+
+def test_booking_confirmation(customer_client, seeded_db):
+    with query_budget(6):
+        response = customer_client.get(f"/booking-confirmation/{seeded_db['booking_id']}")
+    assert response.status_code == 200
+
+
+def test_budget_exceeded_lists_statements(app, seeded_db):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded, match='Query budget of 1 exceeded'):
+            with query_budget(1):
+                ht.User.query.first()
+                ht.Route.query.first()
+
+
+def test_lazy_loads_in_a_loop_are_flagged(app, seeded_db):
+    with app.app_context():
+        bookings = ht.Booking.query.order_by(ht.Booking.id).limit(200).all()
+        with pytest.raises(QueryBudgetExceeded, match='Possible N\\+1'):
+            with query_budget(1000):
+                for booking in bookings:
+                    booking.route.from_city.name
@@ -0,0 +1,89 @@
+"""Booking references: the keyed permutation, its encoding and the generator."""
+import hashlib
+
+import pytest
+
+import app as ht
+import references
+from references import ALPHABET, LENGTH, ReferenceGenerator, encode, permute
+
+KEY = hashlib.sha256(b'test-references').digest()
+
+
+def _inverse_feistel(key, value):
+    left, right = value >> references.HALF_BITS, value & references.HALF_MASK
+    for index in reversed(range(references.ROUNDS)):
+        left, right = right ^ references._round(key, index, left), left
+    return (left << references.HALF_BITS) | right
+
+
+def _decode(reference):
+    """The sequence number behind a reference, undoing encode() and permute()."""
+    value = 0
+    for char in reference:
+        value = value * 32 + ALPHABET.index(char)
+    value &= (1 << references.SPACE_BITS) - 1
+    # Walk the cycle backwards until it lands inside the space again
+    value = _inverse_feistel(KEY, value)
+    while value >> references.SPACE_BITS:
+        value = _inverse_feistel(KEY, value)
+    return value
+
+
+def test_permutation_is_a_bijection_on_a_small_domain(monkeypatch):
+    # The same network over 2 * 6 bits, cycle-walked into 11
+    monkeypatch.setattr(references, 'HALF_BITS', 6)
+    monkeypatch.setattr(references, 'HALF_MASK', (1 << 6) - 1)
+    monkeypatch.setattr(references, 'SPACE_BITS', 11)
+
+    assert sorted(references._feistel(KEY, number) for number in range(1 << 12)) == list(range(1 << 12))
+    outputs = [permute(KEY, number) for number in range(1 << 11)]
+    assert sorted(outputs) == list(range(1 << 11))
+    assert outputs != list(range(1 << 11))
+    with pytest.raises(ValueError):
+        permute(KEY, 1 << 11)
+
+
+def test_references_are_unique_and_well_formed():
+    blocks = []
+
+    def allocate_block(size):
+        start = len(blocks) * size
+        blocks.append((start, start + size))
+        return blocks[-1]
+
+    generator = ReferenceGenerator('test-references', allocate_block, block_size=7)
+    generated = [generator.next_reference() for _ in range(5000)]
+
+    assert len(set(generated)) == len(generated)
+    assert len(blocks) == 715  # ceil(5000 / 7)
+    for reference in generated:
+        assert len(reference) == LENGTH
+        assert set(reference) <= set(ALPHABET)
+        assert not set(reference) & set('ILOU')
+        assert reference[0] in 'GHJKMNPQRSTVWXYZ'
+    assert [_decode(reference) for reference in generated] == list(range(5000))
+
+
+def test_encoding_round_trips_at_the_ends_of_the_space():
+    last = (1 << references.SPACE_BITS) - 1
+    for number in (0, 1, last):
+        assert _decode(encode(permute(KEY, number))) == number
+    assert encode(0) == 'G0000000'
+    assert encode(last) == 'ZZZZZZZZ'
+    with pytest.raises(ValueError, match='exhausted'):
+        permute(KEY, last + 1)
+
+
+def test_app_requires_a_reference_key_unless_debugging_or_testing(monkeypatch):
+    for name in ('REFERENCE_KEY', 'FLASK_ENV', 'FLASK_DEBUG'):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(RuntimeError, match='REFERENCE_KEY must be set'):
+        ht.create_app({'SESSION_BACKEND': 'cookie'})
+
+    # Tests and development share one generated key per host
+    first = ht.create_app({'TESTING': True, 'SESSION_BACKEND': 'cookie'}).config['REFERENCE_KEY']
+    assert first and ht.create_app({'DEBUG': True, 'SESSION_BACKEND': 'cookie'}).config['REFERENCE_KEY'] == first
+
+    monkeypatch.setenv('REFERENCE_KEY', 'from-the-environment')
+    assert ht.create_app({'SESSION_BACKEND': 'cookie'}).config['REFERENCE_KEY'] == 'from-the-environment'
@@ -0,0 +1,142 @@
+"""Read replica routing, read-your-writes stickiness and fallback, with a copy
+of the SQLite test database as the replica."""
+import csv
+import io
+import shutil
+import sqlite3
+
+import pytest
+from sqlalchemy.engine import make_url
+
+import app as ht
+
+
+@pytest.fixture
+def primary_path(app, seeded_db):
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite':
+        pytest.skip('The replica is a copy of the SQLite test database')
+    return url.database
+
+
+@pytest.fixture
+def make_replica_app(app, seeded_db, login):
+    """An app on the test database with one read replica, and an admin client for it."""
+    apps = []
+
+    def make(replica_url):
+        replica_app = ht.create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI'],
+            'DATABASE_REPLICA_URIS': [replica_url]
+        })
+        apps.append(replica_app)
+        return replica_app, login(replica_app, seeded_db['admin_id'], is_admin=True)
+
+    yield make
+    for replica_app in apps:
+        replica_app.extensions['horizon'].close()
+
+
+@pytest.fixture
+def replica(primary_path, tmp_path, make_replica_app):
+    """A replica whose newest booking shows 99 passengers and whose top customer
+    has 100000 bookings, unlike the primary."""
+    path = str(tmp_path / 'replica.db')
+    shutil.copy(primary_path, path)
+    with sqlite3.connect(path) as conn:
+        conn.execute('UPDATE bookings SET passengers = 99 WHERE id = (SELECT MAX(id) FROM bookings)')
+        conn.execute('UPDATE user_spend_rollup SET bookings = 100000 WHERE user_id = (SELECT MIN(user_id) FROM user_spend_rollup)')
+    return make_replica_app(f'sqlite:///{path}')
+
+
+@pytest.fixture
+def unreachable_replica(primary_path, tmp_path, make_replica_app):
+    return make_replica_app(f'sqlite:///{tmp_path}/missing/replica.db')
+
+
+def _replicas_down(app):
+    return app.extensions['horizon'].replica_down_until
+
+
+def _newest_booking(client):
+    response = client.get('/admin/api/bookings', query_string={'limit': 1})
+    assert response.status_code == 200
+    return response.get_json()['items'][0]
+
+
+def _ledger_row(client, reference):
+    response = client.post('/admin/export-report', data={'report_type': 'bookings-ledger', 'period': 3650})
+    assert response.status_code == 200
+    rows = {row['Reference']: row for row in csv.DictReader(io.StringIO(response.get_data(as_text=True)))}
+    return rows[reference]
+
+
+def test_admin_reads_go_to_the_replica(replica):
+    app, admin_client = replica
+    booking = _newest_booking(admin_client)
+    assert booking['passengers'] == 99
+    assert _ledger_row(admin_client, booking['reference'])['Passengers'] == '99'
+
+
+def _top_customer_bookings(client):
+    response = client.get('/admin/api/stats')
+    assert response.status_code == 200
+    return response.get_json()['top_customers'][0]['bookings']
+
+
+def test_async_stats_read_the_replica(replica):
+    app, admin_client = replica
+    assert _top_customer_bookings(admin_client) == 100000
+
+    with admin_client.session_transaction() as session:
+        session['db_sticky_until'] = 2 ** 40
+    assert _top_customer_bookings(admin_client) < 100000
+
+
+def test_reads_stay_on_the_primary_after_a_write(replica):
+    app, admin_client = replica
+    with app.app_context():
+        confirmed = ht.Booking.query.filter_by(status='confirmed').order_by(ht.Booking.id.desc()).first().id
+    assert _newest_booking(admin_client)['passengers'] == 99
+
+    assert admin_client.post(f'/cancel-booking/{confirmed}').status_code == 302
+    assert _newest_booking(admin_client)['passengers'] != 99
+
+    # Once the sticky window has passed, reads go back to the replica
+    with admin_client.session_transaction() as session:
+        session['db_sticky_until'] = 0
+    assert _newest_booking(admin_client)['passengers'] == 99
+
+
+def test_unreachable_replica_falls_back_to_the_primary(unreachable_replica):
+    app, admin_client = unreachable_replica
+    booking = _newest_booking(admin_client)
+    assert booking['passengers'] != 99
+    assert _replicas_down(app)
+
+
+def test_async_stats_fall_back_to_the_primary(unreachable_replica):
+    app, admin_client = unreachable_replica
+    assert _top_customer_bookings(admin_client) < 100000
+    assert _replicas_down(app)
+
+
+def test_streamed_export_falls_back_before_it_starts(unreachable_replica):
+    app, admin_client = unreachable_replica
+    with app.app_context():
+        reference = ht.Booking.query.order_by(ht.Booking.id.desc()).first().reference
+    # Nothing has marked the replica down yet, so the export is the first to find it unreachable
+    assert not _replicas_down(app)
+    assert _ledger_row(admin_client, reference)['Reference'] == reference
+    assert _replicas_down(app)
+
+
+def test_each_app_has_its_own_replicas(admin_client, app, replica):
+    replica_app, replica_admin_client = replica
+    assert app.extensions['horizon'] is not replica_app.extensions['horizon']
+    assert not app.config['SQLALCHEMY_BINDS']
+
+    # The same request, answered from the replica by one app and from the primary by the other
+    assert _newest_booking(replica_admin_client)['passengers'] == 99
+    assert _newest_booking(admin_client)['passengers'] != 99
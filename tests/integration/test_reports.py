@@ -0,0 +1,27 @@
+"""Admin reports over ranges with and without bookings."""
+import csv
+import io
+
+import pytest
+
+import app as ht
+
+# Long before any seeded booking
+EMPTY_RANGE = {'start': '1990-01-01', 'end': '1990-03-31', 'bucket': 'month'}
+
+
+@pytest.mark.parametrize('report', sorted(ht.REPORTS))
+def test_empty_range(admin_client, report):
+    args = dict(EMPTY_RANGE, report_type=report)
+    assert admin_client.get('/admin/reports', query_string=args).status_code == 200
+
+    rows = admin_client.get(f'/admin/api/reports/{report}', query_string=args).get_json()['rows']
+    exported = list(csv.reader(io.StringIO(admin_client.post('/admin/export-report', data=args).get_data(as_text=True))))
+    assert len(exported) == len(rows) + 1
+    if report == 'monthly-sales':
+        # One zero row per bucket, as wide as the report
+        assert rows == [{'period': period, 'bookings': 0, 'revenue': 0.0}
+                        for period in ('1990-01-01', '1990-02-01', '1990-03-01')]
+        assert exported[1:] == [[period, '0', '0.0'] for period in ('1990-01-01', '1990-02-01', '1990-03-01')]
+    else:
+        assert rows == []
@@ -0,0 +1,50 @@
+"""The seat inventory and rollup rows ht_booking.sql derives from its sample bookings."""
+import os
+import re
+
+import app as ht
+from tests.seed import seed_database
+
+SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(ht.__file__)), 'ht_booking.sql')
+
+DERIVED_TABLES = {
+    'seat_inventory': 'route_id, journey_date, seats_remaining',
+    'booking_daily_rollup': 'day, route_id, mode, class_type, bookings, passengers, revenue',
+    'user_spend_rollup': 'user_id, bookings, passengers, spent',
+}
+
+
+def _derived_statements():
+    with open(SQL_PATH) as f:
+        sql = f.read()
+    return re.findall(rf"INSERT INTO (?:{'|'.join(DERIVED_TABLES)}) \(.*?;", sql, re.S)
+
+
+def _derived_rows():
+    return {
+        table: ht.db.session.execute(ht.db.text(f'SELECT {columns} FROM {table} ORDER BY {columns}')).all()
+        for table, columns in DERIVED_TABLES.items()
+    }
+
+
+def test_sql_derives_what_the_rebuilds_compute(tmp_path):
+    app = ht.create_app({
+        'TESTING': True,
+        'SESSION_BACKEND': 'cookie',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'sample.db'}"
+    })
+    with app.app_context():
+        ht.init_db()
+        seed_database(ht, app, 20, 500)
+        ht.rebuild_seat_inventory()
+        expected = _derived_rows()
+        assert all(expected.values())
+
+        statements = _derived_statements()
+        assert len(statements) == len(DERIVED_TABLES)
+        for table in DERIVED_TABLES:
+            ht.db.session.execute(ht.db.text(f'DELETE FROM {table}'))
+        for statement in statements:
+            ht.db.session.execute(ht.db.text(statement))
+        ht.db.session.commit()
+        assert _derived_rows() == expected
@@ -0,0 +1,97 @@
+"""Server-side sessions shared by several workers, and session ids across login."""
+import pytest
+from flask import Flask, jsonify, session
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, create_engine
+
+import app as ht
+from sessions import DatabaseSessionStore, ServerSideSessionInterface, SQLiteSessionStore
+
+
+def _sqlite_store(tmp_path):
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+
+
+def _database_store(tmp_path):
+    metadata = MetaData()
+    table = Table('sessions', metadata, Column('id', String(64), primary_key=True),
+                  Column('data', Text, nullable=False), Column('expires_at', DateTime, nullable=False))
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions_table.db'}")
+    metadata.create_all(engine)
+    return DatabaseSessionStore(table, lambda: engine)
+
+
+def _worker(store):
+    """An app with its own session cache over the shared store, as one worker process would have."""
+    worker = Flask(__name__)
+    worker.secret_key = 'test'
+    worker.session_interface = ServerSideSessionInterface(store, cache_ttl=60)
+
+    @worker.route('/login/<int:user_id>')
+    def login(user_id):
+        session.regenerate()
+        session['user_id'] = user_id
+        return ''
+
+    @worker.route('/logout')
+    def logout():
+        session.clear()
+        return ''
+
+    @worker.route('/visit')
+    def visit():
+        session['visits'] = session.get('visits', 0) + 1
+        return jsonify(user_id=session.get('user_id'))
+
+    return worker
+
+
+def _sid(client):
+    cookie = next((cookie for cookie in client.cookie_jar if cookie.name == 'session'), None)
+    return cookie.value if cookie else None
+
+
+@pytest.fixture(params=[_sqlite_store, _database_store], ids=['sqlite', 'database'])
+def store(request, tmp_path):
+    return request.param(tmp_path)
+
+
+def test_logout_is_not_undone_by_another_workers_cache(store):
+    worker_a, worker_b = _worker(store), _worker(store)
+    client = worker_a.test_client()
+    client.get('/login/7')
+    sid = _sid(client)
+
+    # Worker B caches the session, then the user logs out through worker A
+    client_b = worker_b.test_client()
+    client_b.set_cookie('localhost', 'session', sid)
+    assert client_b.get('/visit').get_json() == {'user_id': 7}
+    client.get('/logout')
+    assert store.load(sid) is None
+
+    # B's next write finds the row gone: it is not written back, and the cookie is dropped
+    client_b.get('/visit')
+    assert store.load(sid) is None
+    assert _sid(client_b) is None
+    assert client_b.get('/visit').get_json() == {'user_id': None}
+
+
+def test_login_moves_the_session_to_a_new_id(store):
+    client = _worker(store).test_client()
+    client.get('/visit')
+    planted = _sid(client)
+
+    client.get('/login/7')
+    assert _sid(client) != planted
+    assert store.load(planted) is None
+    assert store.load(_sid(client))[0] == {'visits': 1, 'user_id': 7}
+
+
+def test_app_login_rotates_the_session_id(app, client, seeded_db):
+    with client.session_transaction() as planted:
+        planted['lang'] = 'en'
+    planted_sid = _sid(client)
+
+    response = client.post('/login', json={'email': f"user{seeded_db['customer_id']}@example.com", 'password': 'password'})
+    assert response.status_code == 200
+    assert _sid(client) not in (None, planted_sid)
+    assert app.session_interface.store.load(planted_sid) is None
@@ -0,0 +1,193 @@
+"""Benchmarks for the hot endpoints against a synthetic database.
+
+    python -m tests.load.bench --users 100000 --bookings 2000000 --output base.json
+    python -m tests.load.bench --compare base.json head.json
+
+Each endpoint is called through the Flask test client. Latency percentiles
+and SQL statements per call are written as JSON, so two commits can be
+compared with --compare. That run exits non-zero if any endpoint's p95 or
+query count regressed.
+
+The database is DATABASE_URL if set (e.g. a MySQL schema), otherwise a SQLite
+file per scale under the temp directory. It is seeded once and reused.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scenarios(ht, app, ids):
+    """(name, client, request function) for every benchmarked endpoint."""
+    def logged_in(user_id, is_admin=False):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['is_admin'] = is_admin
+        return client
+
+    admin = logged_in(ids['admin_id'], is_admin=True)
+    customer = logged_in(ids['customer_id'])
+
+    with app.app_context():
+        routes = [(route.from_city.name, route.to_city.name, route.mode) for route in ht.get_catalog().routes]
+
+    def create_booking(client, iteration):
+        from_city, to_city, mode = routes[iteration % len(routes)]
+        return client.post('/api/booking', json={
+            'from': from_city,
+            'to': to_city,
+            'travel_mode': mode,
+            'departure_date': (date.today() + timedelta(days=30 + iteration % 60)).isoformat(),
+            'passengers': 1,
+            'seat_class': 'standard'
+        })
+
+    return [
+        ('create_booking', customer, create_booking),
+        ('admin', admin, lambda client, iteration: client.get('/admin')),
+        ('admin_reports', admin, lambda client, iteration: client.get(
+            '/admin/reports', query_string={'report_type': 'monthly-sales', 'period': 365})),
+        ('user_dashboard', customer, lambda client, iteration: client.get('/user-dashboard')),
+        ('export_report', admin, lambda client, iteration: client.post(
+            '/admin/export-report', data={'report_type': 'bookings-ledger', 'period': 30}))
+    ]
+
+
+def run(ht, app, ids, iterations, warmup, only=None):
+    from tests.query_budget import QueryCounter
+
+    results = {}
+    for name, client, call in _scenarios(ht, app, ids):
+        if only and name not in only:
+            continue
+        for iteration in range(warmup):
+            call(client, iteration).get_data()
+
+        timings, queries, statuses = [], [], {}
+        for iteration in range(warmup, warmup + iterations):
+            counter = QueryCounter()
+            counter.start()
+            start = time.perf_counter()
+            response = call(client, iteration)
+            response.get_data()  # Streamed bodies only run their queries while being read
+            elapsed = time.perf_counter() - start
+            counter.stop()
+            timings.append(elapsed * 1000)
+            queries.append(len(counter))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+        results[name] = {
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries_per_call': round(sum(queries) / len(queries), 2),
+            'statuses': statuses
+        }
+        print(f"{name:<16} p50 {results[name]['p50_ms']:>9.2f}ms  p95 {results[name]['p95_ms']:>9.2f}ms  "
+              f"p99 {results[name]['p99_ms']:>9.2f}ms  queries {results[name]['queries_per_call']:>7}  {statuses}")
+    return results
+
+
+def compare(base_path, head_path, threshold):
+    """Print per-endpoint changes; return True if anything regressed."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    regressed = False
+    print(f"{'endpoint':<16} {'p50':>18} {'p95':>18} {'p99':>18} {'queries':>14}")
+    for name, after in head['endpoints'].items():
+        before = base['endpoints'].get(name)
+        if before is None:
+            print(f'{name:<16} (new)')
+            continue
+        cells = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            change = (after[key] - before[key]) / before[key] if before[key] else 0.0
+            cells.append(f'{after[key]:>8.2f}ms {change:>+7.1%}')
+        cells.append(f"{before['queries_per_call']:>6} -> {after['queries_per_call']:<6}")
+        flags = []
+        if before['p95_ms'] and (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] > threshold:
+            flags.append('SLOWER')
+        if after['queries_per_call'] > before['queries_per_call']:
+            flags.append('MORE QUERIES')
+        regressed = regressed or bool(flags)
+        print(f"{name:<16} {' '.join(cells)} {' '.join(flags)}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--bookings', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=20240101)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--endpoint', action='append', help='Only run this endpoint (repeatable)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='Compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown treated as a regression')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    import app as ht
+    from tests.seed import find_seeded, seed_database
+
+    database = os.path.join(tempfile.gettempdir(), f'ht_bench_{args.users}_{args.bookings}_{args.seed}.db')
+    app = ht.create_app({
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('DATABASE_URL', f'sqlite:///{database}'),
+        'REFERENCE_KEY': os.environ.get('REFERENCE_KEY', 'bench')
+    })
+    with app.app_context():
+        ht.init_db()
+
+    ids = find_seeded(ht, app, args.bookings)
+    if ids is None:
+        start = time.perf_counter()
+        print(f'Seeding {args.users} users and {args.bookings} bookings...', file=sys.stderr)
+        ids = seed_database(ht, app, args.users, args.bookings, seed=args.seed)
+        print(f'Seeded in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+    endpoints = run(ht, app, ids, args.iterations, args.warmup, only=args.endpoint)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': _git_commit(),
+                'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': ht.db.get_engine(app).url.get_backend_name(),
+                'scale': {'users': args.users, 'bookings': args.bookings, 'seed': args.seed},
+                'iterations': args.iterations,
+                'endpoints': endpoints
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
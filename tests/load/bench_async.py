@@ -0,0 +1,150 @@
+"""Throughput of the async dashboard statistics against the sync path.
+
+    python -m tests.load.bench_async --concurrency 1 --concurrency 8 --duration 10
+    python -m tests.load.bench_async --latency-ms 1 --output async.json
+
+GET /admin/api/stats gathers the dashboard aggregates concurrently on the
+async engine. The benchmark registers a sync twin of it that runs the same
+statements one after another through db.session, then drives each endpoint
+from N threads of a single process (one threaded worker) for --duration
+seconds and reports requests/sec and latency percentiles.
+
+The database is DATABASE_URL if set (e.g. a local MySQL schema), otherwise a
+SQLite file per scale under the temp directory, seeded once and reused.
+SQLite runs in-process, so it has no round trip for async to overlap;
+--latency-ms adds one before every statement, waited with time.sleep on the
+sync path and asyncio.sleep on the async one, as a network wait would be.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import await_only
+
+from tests.load.bench import _git_commit, percentile
+
+
+def _add_round_trip(seconds):
+    """Wait `seconds` before each statement, as a round trip to a database server would."""
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def round_trip(conn, cursor, statement, parameters, context, executemany):
+        if conn.dialect.is_async:
+            await_only(asyncio.sleep(seconds))
+        else:
+            time.sleep(seconds)
+
+
+def _register_sync_twin(ht, app):
+    @ht.admin_required
+    def bench_stats_sync():
+        results = [ht.db.session.execute(query).all() for query in ht._dashboard_queries()]
+        return ht.jsonify(ht._dashboard_json(results, ht.get_catalog()))
+
+    app.add_url_rule('/bench/stats-sync', view_func=bench_stats_sync)
+
+
+def drive(app, admin_id, path, concurrency, duration):
+    """Call `path` from `concurrency` threads for `duration` seconds."""
+    timings, statuses = [], {}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def worker():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = admin_id
+            session['is_admin'] = True
+        client.get(path).get_data()  # Warm up this thread's connections
+        local_timings, local_statuses = [], {}
+        start_barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            local_timings.append((time.perf_counter() - start) * 1000)
+            local_statuses[str(response.status_code)] = local_statuses.get(str(response.status_code), 0) + 1
+        with lock:
+            timings.extend(local_timings)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests_per_sec': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'statuses': statuses
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--bookings', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=20240101)
+    parser.add_argument('--concurrency', type=int, action='append', help='Client threads (repeatable, default 1 and 8)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per endpoint and concurrency')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated round trip added to every statement')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    import app as ht
+    from tests.seed import find_seeded, seed_database
+
+    database = os.path.join(tempfile.gettempdir(), f'ht_bench_{args.users}_{args.bookings}_{args.seed}.db')
+    app = ht.create_app({
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('DATABASE_URL', f'sqlite:///{database}'),
+        'REFERENCE_KEY': os.environ.get('REFERENCE_KEY', 'bench')
+    })
+    with app.app_context():
+        ht.init_db()
+
+    ids = find_seeded(ht, app, args.bookings)
+    if ids is None:
+        print(f'Seeding {args.users} users and {args.bookings} bookings...', file=sys.stderr)
+        ids = seed_database(ht, app, args.users, args.bookings, seed=args.seed)
+    _register_sync_twin(ht, app)
+    if args.latency_ms:
+        _add_round_trip(args.latency_ms / 1000)
+
+    results = {}
+    for concurrency in args.concurrency or [1, 8]:
+        for name, path in (('sync', '/bench/stats-sync'), ('async', '/admin/api/stats')):
+            result = drive(app, ids['admin_id'], path, concurrency, args.duration)
+            results[f'{name}_c{concurrency}'] = result
+            print(f"{name:<6} c={concurrency:<3} {result['requests_per_sec']:>8.1f} req/s  "
+                  f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  {result['statuses']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': _git_commit(),
+                'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+                'database': ht.db.get_engine(app).url.get_backend_name(),
+                'scale': {'users': args.users, 'bookings': args.bookings, 'seed': args.seed},
+                'duration': args.duration,
+                'latency_ms': args.latency_ms,
+                'results': results
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
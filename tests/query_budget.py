@@ -0,0 +1,77 @@
+"""SQL statement budgets and N+1 detection for tests.
+
+    with query_budget(5) as queries:
+        client.get('/admin')
+
+fails if rendering issued more than 5 statements, or if one statement shape
+ran with N_PLUS_ONE_THRESHOLD or more different parameter sets, which is how
+a lazy load inside a template loop shows up.
+"""
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+N_PLUS_ONE_THRESHOLD = 3
+
+_WHITESPACE = re.compile(r'\s+')
+# Expanded IN lists differ in length from call to call but are the same query
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s)\s*,)+\s*(?:\?|%s|%\(\w+\)s)\s*\)')
+
+
+def statement_shape(statement):
+    """Normalise a statement so that executions differing only in parameters compare equal."""
+    return _IN_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def start(self):
+        event.listen(Engine, 'before_cursor_execute', self._record)
+
+    def stop(self):
+        event.remove(Engine, 'before_cursor_execute', self._record)
+
+    def n_plus_one_suspects(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Statement shapes executed with at least `threshold` distinct parameter sets."""
+        parameters = defaultdict(set)
+        for statement, params in self.statements:
+            parameters[statement_shape(statement)].add(repr(params))
+        return {shape: len(seen) for shape, seen in parameters.items() if len(seen) >= threshold}
+
+    def report(self):
+        lines = [f'{len(self.statements)} statements:']
+        lines.extend(f'  {statement_shape(statement)}  {params!r}' for statement, params in self.statements)
+        return '\n'.join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_statements, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD):
+    """Fail if the block runs more than `max_statements` statements or looks like an N+1."""
+    counter = QueryCounter()
+    counter.start()
+    try:
+        yield counter
+    finally:
+        counter.stop()
+
+    if len(counter) > max_statements:
+        raise QueryBudgetExceeded(f'Query budget of {max_statements} exceeded\n{counter.report()}')
+    suspects = counter.n_plus_one_suspects(n_plus_one_threshold)
+    if suspects:
+        details = '\n'.join(f'  {count}x  {shape}' for shape, count in suspects.items())
+        raise QueryBudgetExceeded(f'Possible N+1 queries:\n{details}\n{counter.report()}')
@@ -0,0 +1,97 @@
+"""Deterministic synthetic users and bookings for tests and benchmarks.
+
+The same seed and scale always produce the same rows (dates are relative to
+the day they are generated). Rows are inserted in chunks through Core
+executemany, so millions of bookings need flat memory.
+"""
+import random
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+CUSTOMER_BOOKINGS = 25  # Bookings owned by the first generated user (the "customer")
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def seed_database(ht, app, users, bookings, seed=20240101, chunk_size=10000):
+    """Insert `users` users and `bookings` bookings over the existing routes.
+
+    `ht` is the imported app module and `app` one it created. Returns the ids tests and benchmarks log in
+    as: the admin, the customer and the customer's first booking.
+    """
+    rng = random.Random(seed)
+    with app.app_context():
+        routes = [(route.id, float(route.standard_fare)) for route in ht.Route.query.order_by(ht.Route.id)]
+        first_user_id = (ht.db.session.query(ht.db.func.max(ht.User.id)).scalar() or 0) + 1
+        password = ht.generate_password_hash('password')
+        # Dates are relative to today so "last 30 days" and upcoming/past views have data
+        today = date.today()
+        now = datetime.combine(today, datetime.min.time())
+
+        def user_rows():
+            for index in range(users):
+                yield {
+                    'first_name': f'First{index}',
+                    'last_name': f'Last{index}',
+                    'email': f'user{first_user_id + index}@example.com',
+                    'phone': '07000000000',
+                    'password': password,
+                    'is_admin': False,
+                    'created_at': now - timedelta(days=rng.randrange(365))
+                }
+
+        def booking_rows():
+            for index in range(bookings):
+                route_id, fare = rng.choice(routes)
+                passengers = rng.randint(1, 4)
+                if index < CUSTOMER_BOOKINGS:
+                    user_id = first_user_id
+                else:
+                    user_id = first_user_id + rng.randrange(users)
+                yield {
+                    'user_id': user_id,
+                    'route_id': route_id,
+                    'reference': f'T{index:09d}',  # 10 characters, so never equal to a generated reference
+                    'journey_date': today + timedelta(days=rng.randint(-180, 90)),
+                    'passengers': passengers,
+                    'class_type': 'standard',
+                    'base_price': fare,
+                    'class_upgrade': 0,
+                    'discount': 0,
+                    'total_price': round(fare * passengers, 2),
+                    'status': rng.choice(('confirmed', 'confirmed', 'confirmed', 'cancelled')),
+                    'created_at': now - timedelta(days=rng.randrange(365), seconds=rng.randrange(86400))
+                }
+
+        for chunk in _chunks(user_rows(), chunk_size):
+            ht.db.session.execute(ht.User.__table__.insert(), chunk)
+        ht.db.session.commit()
+        for chunk in _chunks(booking_rows(), chunk_size):
+            ht.db.session.execute(ht.Booking.__table__.insert(), chunk)
+            ht.db.session.commit()
+        ht.rebuild_booking_rollups()
+
+        return seeded_ids(ht, app, first_user_id)
+
+
+def find_seeded(ht, app, bookings):
+    """ids of a database seeded earlier with at least `bookings` bookings, or None."""
+    with app.app_context():
+        customer = ht.User.query.filter(ht.User.email.like('user%@example.com')).order_by(ht.User.id).first()
+        if customer is None or ht.Booking.query.count() < bookings:
+            return None
+    return seeded_ids(ht, app, customer.id)
+
+
+def seeded_ids(ht, app, customer_id):
+    with app.app_context():
+        admin = ht.User.query.filter_by(is_admin=True).first()
+        booking_id = ht.db.session.query(ht.db.func.min(ht.Booking.id)).filter_by(user_id=customer_id).scalar()
+        return {'admin_id': admin.id, 'customer_id': customer_id, 'booking_id': booking_id}